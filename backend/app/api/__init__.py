@@ -4,5 +4,7 @@ from .users import router as users_router
 from .settings import router as settings_router
 from .dcc import router as dcc_router
 from .projects import router as projects_router
+from .project_settings import router as project_settings_router
+from .defaults import router as defaults_router
 
-__all__ = ["auth_router", "users_router", "settings_router", "dcc_router", "projects_router"]
+__all__ = ["auth_router", "users_router", "settings_router", "dcc_router", "projects_router", "project_settings_router", "defaults_router"]
@@ -1,18 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import hashlib
+import logging
+import secrets
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import timedelta
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+from app.core import (
+    get_db,
+    session_scope,
+    dialect_insert,
+    create_access_token,
+    verify_password_async,
+    get_password_hash_async,
+    decode_access_token,
+    settings,
+    TTLCache,
+    HashingOverloaded,
+    revoked_tokens,
+)
+from app.models import User, RefreshToken, RevokedToken
+from app.schemas import UserCreate, UserResponse, UserUpdate, Token, UserLogin, RefreshRequest
 
-from app.core import get_db, create_access_token, verify_password, get_password_hash, decode_access_token, settings
-from app.models import User
-from app.schemas import UserCreate, UserResponse, UserUpdate, Token, UserLogin
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Detached User objects keyed by user id, so most requests skip the user lookup
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# Studio administrators, configured by username
+admin_usernames = frozenset(
+    name.strip() for name in settings.ADMIN_USERNAMES.split(",") if name.strip()
+)
+
+
+# Expired refresh tokens and revocations are deleted once every this many syncs
+PRUNE_EVERY_SYNCS = 60
+
+# (jti, user id, expiry) of a revoked access token
+Revocation = Tuple[str, Optional[int], datetime]
+
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def invalidate_principal(user_id: int):
+    """Drop a cached principal after the user has been modified."""
+    principal_cache.delete(user_id)
+
+
+def hashing_overloaded_exception() -> HTTPException:
+    """Error returned when the password hashing queue is full."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent logins, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     """Get current authenticated user."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -24,24 +78,157 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if payload is None:
         raise credentials_exception
     
+    # Checked in memory; the revocation list is synced in the background
+    if payload.get("jti") in revoked_tokens:
+        raise credentials_exception
+    
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    user_id = payload.get("uid")
+    if user_id is None:
+        # Tokens issued before the user id claim existed
+        user = await db.scalar(select(User).filter(User.username == username))
+        if user is None:
+            raise credentials_exception
+        return user
+    
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
     
+    # Detach so later commits in this session cannot expire the shared instance
+    db.expunge(user)
+    principal_cache.set(user_id, user)
     return user
 
 
+def is_admin(user: User) -> bool:
+    """Whether the user is a studio administrator."""
+    return user.username in admin_usernames
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Get the current user, who must be a studio administrator."""
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required"
+        )
+    return current_user
+
+
+def hash_refresh_token(token: str) -> str:
+    """Digest under which a refresh token is stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def as_utc(value: datetime) -> datetime:
+    """Attach UTC to timestamps SQLite returns without a time zone."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def issue_tokens(db: AsyncSession, user: User, family: Optional[str] = None) -> dict:
+    """Create an access token and a refresh token for a user; the caller commits.
+
+    ``family`` is the rotation family of the refresh token being replaced, or
+    None to start a new one at login.
+    """
+    access_jti = uuid.uuid4().hex
+    access_token = create_access_token(
+        data={"sub": user.username, "uid": user.id, "jti": access_jti},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user.id,
+        token_hash=hash_refresh_token(refresh_token),
+        family=family or uuid.uuid4().hex,
+        access_jti=access_jti,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+async def revoke_family(db: AsyncSession, family: str) -> List[Revocation]:
+    """Revoke every refresh token of a rotation family and the access tokens issued with them.
+
+    Returns the access token revocations to store with ``store_revocations``.
+    """
+    now = datetime.now(timezone.utc)
+    access_lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    await db.execute(update(RefreshToken).where(
+        RefreshToken.family == family,
+        RefreshToken.revoked_at.is_(None)
+    ).values(revoked_at=now))
+    # Only access tokens issued within their lifetime can still be in use
+    result = await db.execute(select(RefreshToken.access_jti, RefreshToken.user_id).filter(
+        RefreshToken.family == family,
+        RefreshToken.access_jti.is_not(None),
+        RefreshToken.created_at > now - access_lifetime
+    ))
+    return [(jti, user_id, now + access_lifetime) for jti, user_id in result.all()]
+
+
+async def store_revocations(db: AsyncSession, revocations: List[Revocation]):
+    """Record revoked access tokens for every worker; the caller commits, then calls ``remember_revocations``."""
+    if not revocations:
+        return
+    insert = dialect_insert(db.get_bind())
+    await db.execute(
+        insert(RevokedToken.__table__).on_conflict_do_nothing(index_elements=["jti"]),
+        [{"jti": jti, "user_id": user_id, "expires_at": expires_at} for jti, user_id, expires_at in revocations]
+    )
+
+
+def remember_revocations(revocations: List[Revocation]):
+    """Reject committed revocations in this worker right away instead of at the next sync."""
+    for jti, _, expires_at in revocations:
+        revoked_tokens.add(jti, expires_at.timestamp())
+
+
+async def sync_revoked_tokens(prune: bool = False):
+    """Load the unexpired revoked access tokens into this worker's revocation list.
+
+    With ``prune``, expired revocations and refresh tokens are deleted first.
+    """
+    now = datetime.now(timezone.utc)
+    async with session_scope() as db:
+        if prune:
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            await db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+            await db.commit()
+        result = await db.execute(select(RevokedToken.jti, RevokedToken.expires_at).filter(
+            RevokedToken.expires_at > now
+        ))
+        rows = result.all()
+    revoked_tokens.merge((jti, as_utc(expires_at).timestamp()) for jti, expires_at in rows)
+
+
+async def run_revocation_sync():
+    """Keep the revocation list in sync with the database until cancelled."""
+    syncs = 0
+    while True:
+        try:
+            await sync_revoked_tokens(prune=syncs % PRUNE_EVERY_SYNCS == 0)
+        except Exception:
+            logger.exception("Syncing revoked tokens failed")
+        syncs += 1
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).filter(
         (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(
@@ -50,7 +237,10 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except HashingOverloaded:
+        raise hashing_overloaded_exception()
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -61,18 +251,25 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    """Login and get access token."""
-    user = db.query(User).filter(User.username == form_data.username).first()
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    """Login and get an access token and a refresh token."""
+    user = await db.scalar(select(User).filter(User.username == form_data.username))
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_password_async(form_data.password, user.hashed_password)
+        except HashingOverloaded:
+            raise hashing_overloaded_exception()
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -85,15 +282,103 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="Inactive user"
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    # Transparently upgrade hashes created with outdated Argon2 parameters
+    if new_hash:
+        user.hashed_password = new_hash
+    
+    tokens = issue_tokens(db, user)
+    await db.commit()
+    if new_hash:
+        invalidate_principal(user.id)
+    
+    return tokens
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access token and refresh token.
+    
+    Each refresh token can be used once. Presenting one that was already used
+    means a copy of it leaked, so every token issued since the login it came
+    from is revoked and the user has to log in again.
+    """
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    row = (await db.execute(select(RefreshToken, User).join(
+        User,
+        User.id == RefreshToken.user_id
+    ).filter(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    ))).first()
+    if row is None:
+        raise invalid_exception
+    token, user = row
+    
+    if token.revoked_at is None:
+        if as_utc(token.expires_at) <= datetime.now(timezone.utc) or not user.is_active:
+            raise invalid_exception
+        # Claimed conditionally, so of two concurrent refreshes only one rotates the token
+        claimed = await db.execute(update(RefreshToken).where(
+            RefreshToken.id == token.id,
+            RefreshToken.revoked_at.is_(None)
+        ).values(revoked_at=datetime.now(timezone.utc)))
+        if claimed.rowcount == 1:
+            tokens = issue_tokens(db, user, family=token.family)
+            await db.commit()
+            return tokens
+    
+    # The token was used before
+    revocations = await revoke_family(db, token.family)
+    await store_revocations(db, revocations)
+    await db.commit()
+    remember_revocations(revocations)
+    raise invalid_exception
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: Optional[RefreshRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke the current access token and the refresh tokens of this login.
+
+    The login is identified by the posted refresh token or, without a body,
+    by the refresh token issued together with the access token.
+    """
+    # A cache hit: get_current_user has just verified the token
+    payload = decode_access_token(token)
+    revocations: List[Revocation] = []
+    if payload.get("jti") and isinstance(payload.get("exp"), (int, float)):
+        expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+        revocations.append((payload["jti"], current_user.id, expires_at))
+    
+    family = None
+    if request is not None:
+        family = await db.scalar(select(RefreshToken.family).filter(
+            RefreshToken.token_hash == hash_refresh_token(request.refresh_token),
+            RefreshToken.user_id == current_user.id
+        ))
+    elif payload.get("jti"):
+        family = await db.scalar(select(RefreshToken.family).filter(
+            RefreshToken.access_jti == payload["jti"],
+            RefreshToken.user_id == current_user.id
+        ))
+    if family is not None:
+        revocations += await revoke_family(db, family)
+    
+    await store_revocations(db, revocations)
+    await db.commit()
+    remember_revocations(revocations)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
@@ -1,47 +1,256 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
 
-from app.plugins import plugin_registry, DCCSettingTemplate
-from app.models import User
-from .auth import get_current_user
+from app.core import get_db, settings_events
+from app.plugins import plugin_registry, DCCSettingTemplate, CatalogEntry, PluginLoadError
+from app.models import User, Project, user_projects
+from .auth import get_current_user, get_current_admin
+from .defaults import resolve_effective_settings, effective_cache
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; snapshots are then served as JSON only
+    msgpack = None
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/dcc", tags=["DCC Tools"])
 
+# Channel of settings_events announcing plugin reloads to the other workers
+PLUGINS_CHANNEL = "plugins"
+# Lets a worker ignore its own reload announcements
+WORKER_ID = uuid.uuid4().hex
+# Reloads announced by other workers that are still running
+_announced_reloads = set()
+
+# Bumped whenever the layout of the snapshot payload changes
+SNAPSHOT_FORMAT_VERSION = 2
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+# Smaller bodies are not worth the gzip header and CPU time
+SNAPSHOT_GZIP_MIN_BYTES = 512
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def catalog_response(request: Request, entry: CatalogEntry) -> Response:
+    """Serve a pre-serialized document, or 304 if the client already has it."""
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("/plugins")
-def list_plugins(current_user: User = Depends(get_current_user)):
+async def list_plugins(request: Request, current_user: User = Depends(get_current_user)):
     """List all available DCC tool plugins."""
-    plugins = plugin_registry.list_plugins()
-    return [
-        {
-            "name": plugin.name,
-            "display_name": plugin.display_name,
-            "description": plugin.description
-        }
-        for plugin in plugins
-    ]
+    return catalog_response(request, plugin_registry.get_plugins_document())
+
+
+@router.get("/plugins/status")
+async def get_plugin_status(current_admin: User = Depends(get_current_admin)):
+    """Source and load state of every discovered plugin (administrators only)."""
+    return {"reloads": plugin_registry.reloads, "plugins": plugin_registry.status()}
+
+
+async def reload_local_plugins() -> Dict[str, str]:
+    """Reload this worker's plugins and drop the effective settings resolved with the old ones."""
+    # Importing and executing plugin modules blocks
+    sources = await run_in_threadpool(plugin_registry.reload)
+    effective_cache.clear()
+    return sources
+
+
+async def _reload_announced_plugins():
+    try:
+        await reload_local_plugins()
+    except PluginLoadError as e:
+        logger.error("Plugin reload announced by another worker failed, keeping the current plugins: %s", e)
+
+
+def on_plugins_event(event: str, data: Dict[str, str]):
+    """Reload the plugins when another worker announces a reload (``PLUGINS_CHANNEL`` listener).
+
+    Announcements only reach other workers through a shared broker plugged
+    in with ``EventHub.use_broker``; the default ``LocalBroker`` delivers
+    within this process, where the worker's own announcements are ignored.
+    """
+    if event != "reload" or data.get("origin") == WORKER_ID:
+        return
+    task = asyncio.get_running_loop().create_task(_reload_announced_plugins())
+    _announced_reloads.add(task)
+    task.add_done_callback(_announced_reloads.discard)
+
+
+@router.post("/plugins/reload")
+async def reload_plugins(current_admin: User = Depends(get_current_admin)):
+    """Rediscover plugins from entry points and the plugins directory (administrators only).
+
+    Every plugin is loaded before the new set replaces the current one, so a
+    plugin that fails to load leaves the running plugins untouched. Once the
+    worker serving the request has reloaded, it drops the effective settings
+    it has cached, as template defaults may have changed, and announces the
+    reload on ``PLUGINS_CHANNEL``.
+
+    The other workers only receive the announcement, and reload in the same
+    way, if a shared broker is plugged in with ``EventHub.use_broker``. With
+    the default ``LocalBroker`` the reload stays in the serving process, and
+    other uvicorn workers keep their plugins until they restart.
+    """
+    try:
+        sources = await reload_local_plugins()
+    except PluginLoadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Plugin reload failed, keeping the current plugins: {e}"
+        )
+    await settings_events.publish(PLUGINS_CHANNEL, "reload", {"origin": WORKER_ID})
+    return {"reloads": plugin_registry.reloads, "plugins": sources}
 
 
 @router.get("/templates")
-def get_all_templates(current_user: User = Depends(get_current_user)):
+async def get_all_templates(request: Request, current_user: User = Depends(get_current_user)):
     """Get all setting templates from all DCC plugins."""
-    return plugin_registry.get_all_templates()
+    return catalog_response(request, plugin_registry.get_templates_document())
 
 
 @router.get("/templates/{plugin_name}")
-def get_plugin_template(plugin_name: str, current_user: User = Depends(get_current_user)):
+async def get_plugin_template(plugin_name: str, request: Request, current_user: User = Depends(get_current_user)):
     """Get setting template for a specific DCC plugin."""
-    plugin = plugin_registry.get_plugin(plugin_name)
-    if not plugin:
-        from fastapi import HTTPException, status
+    document = plugin_registry.get_plugin_document(plugin_name)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plugin '{plugin_name}' not found"
+        )
+
+    return catalog_response(request, document)
+
+
+def accepts(header: str, token: str) -> bool:
+    """Check whether a comma-separated Accept* header lists a token with non-zero quality."""
+    for part in (header or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() == token:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+@router.get("/snapshot/{plugin_name}")
+async def get_launch_snapshot(
+    plugin_name: str,
+    project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get everything a DCC tool needs at startup in one compact response.
+
+    Combines the current user, the project, the plugin's templates and the
+    effective settings of the plugin's category (template defaults overlaid by
+    the layered defaults and stored values). The payload carries a ``version``
+    stamp, which is also the ETag: a client sending it back in
+    ``If-None-Match`` gets a 304 after a single indexed query while its
+    resolved settings are cached. The body is msgpack when the ``Accept`` header asks
+    for it (and msgpack is installed), JSON otherwise, and gzip-compressed
+    when the client accepts it.
+    """
+    document = plugin_registry.get_plugin_document(plugin_name)
+    if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Plugin '{plugin_name}' not found"
         )
-    
-    return {
-        "name": plugin.name,
-        "display_name": plugin.display_name,
-        "description": plugin.description,
-        "settings": plugin.get_settings_template()
+
+    # Membership check and project name in one indexed lookup
+    project_name = await db.scalar(select(Project.name).join(
+        user_projects,
+        and_(
+            user_projects.c.project_id == Project.id,
+            user_projects.c.user_id == current_user.id
+        )
+    ).filter(
+        Project.id == project_id
+    ))
+
+    if project_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found or access denied"
+        )
+
+    user = {
+        "id": current_user.id,
+        "username": current_user.username,
+        "email": current_user.email,
+        "full_name": current_user.full_name,
+        "section": current_user.section,
+        "unit": current_user.unit,
+    }
+    project = {"id": project_id, "name": project_name}
+    # Served from the resolution cache while no layer of this user's settings changed
+    settings = await resolve_effective_settings(db, current_user, project_id, plugin_name)
+
+    digest = hashlib.sha256(json.dumps(
+        [SNAPSHOT_FORMAT_VERSION, document.etag, user, project, settings],
+        separators=(",", ":"), sort_keys=True
+    ).encode("utf-8"))
+    version = digest.hexdigest()[:32]
+
+    use_msgpack = msgpack is not None and any(
+        accepts(request.headers.get("accept"), media_type) for media_type in MSGPACK_MEDIA_TYPES
+    )
+    use_gzip = accepts(request.headers.get("accept-encoding"), "gzip")
+
+    # Each encoding of the snapshot is a distinct representation with its own strong ETag
+    etag = f'"{version}{"-msgpack" if use_msgpack else ""}"'
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept, Accept-Encoding, Authorization",
+    }
+    gzip_etag = f'{etag[:-1]}-gzip"'
+    if_none_match = request.headers.get("if-none-match")
+    for candidate in (etag, gzip_etag):
+        if etag_matches(if_none_match, candidate):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": candidate})
+
+    payload = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "version": version,
+        "user": user,
+        "project": project,
+        "plugin": plugin_name,
+        "templates": plugin_registry.get_template_data(plugin_name),
+        "settings": settings,
     }
+
+    if use_msgpack:
+        body = msgpack.packb(payload, use_bin_type=True)
+        media_type = MSGPACK_MEDIA_TYPES[0]
+    else:
+        body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        media_type = "application/json"
+
+    if use_gzip and len(body) >= SNAPSHOT_GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+        etag = gzip_etag
+
+    return Response(content=body, media_type=media_type, headers={**headers, "ETag": etag})
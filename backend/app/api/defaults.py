@@ -0,0 +1,280 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import JSON, String, and_, cast, func, literal, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import get_db, dialect_insert, settings, TaggedCache
+from app.models import User, Project, UserSetting, SettingDefault, DEFAULT_SCOPES, user_projects
+from app.schemas import SettingDefaultUpsert, SettingDefaultResponse
+from app.plugins import plugin_registry, normalize_setting_value, setting_value_columns, SettingValidationError
+from .auth import get_current_user, is_admin
+
+router = APIRouter(prefix="/defaults", tags=["Defaults"])
+
+# Later layers override earlier ones
+SCOPE_PRECEDENCE = {scope: rank for rank, scope in enumerate(DEFAULT_SCOPES + ("user",))}
+
+# Effective settings keyed by (user_id, project_id, category) and tagged with
+# every scope they were resolved from, so a change to one default only drops
+# the entries of the users it applies to.
+effective_cache = TaggedCache(
+    maxsize=settings.EFFECTIVE_CACHE_SIZE,
+    ttl=settings.EFFECTIVE_CACHE_TTL_SECONDS,
+)
+
+
+def _in_category(category: Optional[str]):
+    if category is None:
+        return None
+    return lambda key: key[2] == category
+
+
+def invalidate_defaults(scope: str, target: str, category: Optional[str] = None):
+    """Drop resolved settings that depend on a scope's defaults."""
+    if scope == "studio":
+        effective_cache.invalidate(("studio",), _in_category(category))
+    else:
+        effective_cache.invalidate((scope, target), _in_category(category))
+
+
+def invalidate_user_settings(user_id: int, project_id: Optional[int] = None, category: Optional[str] = None):
+    """Drop resolved settings of a user after their settings or section/unit changed."""
+    def matches(key):
+        return (project_id is None or key[1] == project_id) and (category is None or key[2] == category)
+    effective_cache.invalidate(("user", user_id), matches)
+
+
+def invalidate_project_settings(project_id: int):
+    """Drop resolved settings of every user of a project."""
+    effective_cache.invalidate(("project", str(project_id)))
+
+
+def _effective_layers(user: User, project_id: int) -> List[Tuple[str, str]]:
+    """The (scope, target) default layers applying to a user in a project, in precedence order."""
+    layers = [("studio", ""), ("project", str(project_id))]
+    if user.section:
+        layers.append(("section", user.section))
+    if user.unit:
+        layers.append(("unit", user.unit))
+    return layers
+
+
+def _effective_rows(user: User, project_id: int, layers: List[Tuple[str, str]], category: Optional[str] = None):
+    """One statement reading the default rows of ``layers`` and the user's own rows.
+
+    Default rows carry their text in ``value`` for the caller to parse; the
+    user's rows carry the ``typed_value`` parsed when they were written.
+    """
+    defaults = select(
+        SettingDefault.scope,
+        SettingDefault.category,
+        SettingDefault.key,
+        SettingDefault.value,
+        cast(null(), JSON).label("typed_value")
+    ).filter(or_(*(
+        and_(SettingDefault.scope == scope, SettingDefault.target == target)
+        for scope, target in layers
+    )))
+    own = select(
+        literal("user").label("scope"),
+        UserSetting.category,
+        UserSetting.key,
+        UserSetting.value,
+        UserSetting.typed_value
+    ).filter(
+        UserSetting.user_id == user.id,
+        UserSetting.project_id == project_id
+    )
+    if category is not None:
+        defaults = defaults.filter(SettingDefault.category == category)
+        own = own.filter(UserSetting.category == category)
+    return union_all(defaults, own)
+
+
+def _overlay(category: str, rows) -> Dict[str, Any]:
+    """Overlay the template defaults of a category with its rows, lowest precedence first.
+
+    Every value is typed the same way: default rows are parsed according to
+    the template type of their key, as stored rows were when written.
+    """
+    effective = plugin_registry.get_defaults(category)
+    for row in sorted(rows, key=lambda row: SCOPE_PRECEDENCE[row.scope]):
+        if row.scope == "user":
+            effective[row.key] = row.typed_value
+        else:
+            effective[row.key] = setting_value_columns(category, row.key, row.value)["typed_value"]
+    return effective
+
+
+def _cache_effective(user: User, project_id: int, layers, category: str, effective: Dict[str, Any], generation: int):
+    tags = [("studio",), ("user", user.id)] + [layer for layer in layers if layer[0] != "studio"]
+    effective_cache.set((user.id, project_id, category), effective, tags, generation)
+
+
+async def resolve_effective_settings(
+    db: AsyncSession, user: User, project_id: int, category: str
+) -> Dict[str, Any]:
+    """Resolve the effective settings of a user in a project for one category.
+
+    Plugin template defaults are overlaid with the studio, project, section
+    and unit defaults and finally the user's own rows, all read with one
+    statement. Values are typed according to the plugin template. Results
+    are cached until one of those layers changes.
+    """
+    cached = effective_cache.get((user.id, project_id, category))
+    if cached is not None:
+        return dict(cached)
+
+    generation = effective_cache.generation
+    layers = _effective_layers(user, project_id)
+    result = await db.execute(_effective_rows(user, project_id, layers, category))
+    effective = _overlay(category, result.all())
+    _cache_effective(user, project_id, layers, category, effective, generation)
+    return dict(effective)
+
+
+async def resolve_all_effective_settings(
+    db: AsyncSession, user: User, project_id: int
+) -> Dict[str, Dict[str, Any]]:
+    """Resolve the effective settings of a user in a project for every category.
+
+    Covers the plugin categories and any category with applicable defaults
+    or stored values. All layers of all categories are read with one
+    statement, grouped by category in Python, and each category is cached
+    as ``resolve_effective_settings`` would.
+    """
+    generation = effective_cache.generation
+    layers = _effective_layers(user, project_id)
+    result = await db.execute(_effective_rows(user, project_id, layers))
+
+    rows_by_category: Dict[str, list] = {name: [] for name in plugin_registry.plugin_names()}
+    for row in result.all():
+        rows_by_category.setdefault(row.category, []).append(row)
+
+    resolved = {}
+    for category, rows in rows_by_category.items():
+        effective = _overlay(category, rows)
+        _cache_effective(user, project_id, layers, category, effective, generation)
+        resolved[category] = dict(effective)
+    return resolved
+
+
+async def check_can_manage(db: AsyncSession, scope: str, target: str, current_user: User):
+    """Project defaults are managed by the project's owners and admins; all others by studio administrators."""
+    if is_admin(current_user):
+        return
+    if scope == "project":
+        role = await db.scalar(select(user_projects.c.role).filter(
+            user_projects.c.project_id == int(target),
+            user_projects.c.user_id == current_user.id
+        ))
+        if role in ("owner", "admin"):
+            return
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to manage these defaults"
+    )
+
+
+@router.get("/", response_model=List[SettingDefaultResponse])
+async def list_defaults(
+    scope: Optional[str] = None,
+    target: Optional[str] = None,
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List setting defaults, optionally filtered by scope, target and category.
+
+    Project defaults are only listed for the projects the current user is a
+    member of, unless they are a studio administrator.
+    """
+    query = select(SettingDefault)
+    if not is_admin(current_user):
+        member_projects = select(cast(user_projects.c.project_id, String)).filter(
+            user_projects.c.user_id == current_user.id
+        )
+        query = query.filter(or_(
+            SettingDefault.scope != "project",
+            SettingDefault.target.in_(member_projects)
+        ))
+    if scope:
+        query = query.filter(SettingDefault.scope == scope)
+    if target is not None:
+        query = query.filter(SettingDefault.target == target)
+    if category:
+        query = query.filter(SettingDefault.category == category)
+
+    result = await db.scalars(query.order_by(
+        SettingDefault.scope, SettingDefault.target, SettingDefault.category, SettingDefault.key
+    ))
+    return result.all()
+
+
+@router.put("/", response_model=SettingDefaultResponse)
+async def upsert_default(
+    default_data: SettingDefaultUpsert,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create or replace the default of a key within a scope."""
+    try:
+        value = normalize_setting_value(default_data.category, default_data.key, default_data.value)["value"]
+    except SettingValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+    await check_can_manage(db, default_data.scope, default_data.target, current_user)
+
+    if default_data.scope == "project":
+        project = await db.get(Project, int(default_data.target))
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+
+    insert = dialect_insert(db.get_bind())
+    stmt = insert(SettingDefault.__table__).values(**{**default_data.model_dump(), "value": value})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scope", "target", "category", "key"],
+        set_={
+            "value": stmt.excluded.value,
+            "description": stmt.excluded.description,
+            "updated_at": func.now(),
+        }
+    ).returning(*SettingDefault.__table__.c)
+
+    try:
+        result = await db.execute(stmt)
+        row = result.one()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    invalidate_defaults(default_data.scope, default_data.target, default_data.category)
+    return row._mapping
+
+
+@router.delete("/{default_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_default(
+    default_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a setting default."""
+    default = await db.get(SettingDefault, default_id)
+    if not default:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Default not found"
+        )
+
+    await check_can_manage(db, default.scope, default.target, current_user)
+
+    await db.delete(default)
+    await db.commit()
+    invalidate_defaults(default.scope, default.target, default.category)
@@ -0,0 +1,442 @@
+import json
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import get_db, session_scope, dialect_insert
+from app.models import User, Project, UserSetting, user_projects
+from app.schemas import UserSettingImportResult, UserSettingQueryMatch
+from app.plugins import plugin_registry, normalize_setting_value, typed_value_columns, coerce_value
+from .auth import get_current_user
+from .defaults import invalidate_project_settings
+from .pagination import decode_cursor, set_next_cursor
+
+router = APIRouter(prefix="/projects", tags=["Project Settings"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MANAGER_ROLES = ("owner", "admin")
+
+# Rows fetched per server-side cursor round trip when exporting
+EXPORT_BATCH_SIZE = 1000
+# Rows fetched per server-side cursor round trip when building the settings matrix
+MATRIX_BATCH_SIZE = 1000
+# Rows inserted per statement when importing
+IMPORT_BATCH_SIZE = 500
+# Longest accepted import line; guards against unbounded buffering of a body without newlines
+MAX_IMPORT_LINE_BYTES = 1024 * 1024
+# Rejected lines listed individually in the import result
+MAX_REPORTED_REJECTIONS = 100
+
+
+async def get_managed_project(db: AsyncSession, project_id: int, current_user: User) -> Project:
+    """Return an active project the current user owns or administers."""
+    project = await db.scalar(select(Project).join(
+        user_projects,
+        Project.id == user_projects.c.project_id
+    ).filter(
+        Project.id == project_id,
+        Project.is_active == True,
+        user_projects.c.user_id == current_user.id,
+        user_projects.c.role.in_(MANAGER_ROLES)
+    ))
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found or insufficient permissions"
+        )
+
+    return project
+
+
+@router.get("/{project_id}/settings/export")
+async def export_project_settings(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every setting of a project as newline-delimited JSON.
+
+    Each line holds ``username``, ``category``, ``key``, ``value`` and
+    ``description``, so the output can be fed back to the import endpoint of
+    another project or database. Rows are read through a server-side cursor
+    and written as they arrive; the export is never held in memory.
+    """
+    await get_managed_project(db, project_id, current_user)
+
+    query = select(
+        User.username,
+        UserSetting.category,
+        UserSetting.key,
+        UserSetting.value,
+        UserSetting.description
+    ).join(
+        User,
+        User.id == UserSetting.user_id
+    ).filter(
+        UserSetting.project_id == project_id
+    ).order_by(
+        UserSetting.category, UserSetting.key, UserSetting.user_id
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async def generate_lines():
+        # The request's session is closed once this handler returns, so the
+        # body is produced from a session of its own
+        async with session_scope() as session:
+            result = await session.stream(query)
+            try:
+                async for rows in result.partitions(EXPORT_BATCH_SIZE):
+                    yield "".join(
+                        json.dumps(dict(row._mapping), ensure_ascii=False) + "\n"
+                        for row in rows
+                    ).encode("utf-8")
+            finally:
+                await result.close()
+
+    return StreamingResponse(
+        generate_lines(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-settings.ndjson"'}
+    )
+
+
+async def iter_lines(request: Request):
+    """Yield the lines of the request body as they are received."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > MAX_IMPORT_LINE_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Import lines must not exceed {MAX_IMPORT_LINE_BYTES} bytes"
+            )
+    if buffer:
+        yield buffer
+
+
+def parse_import_line(line: bytes) -> Dict[str, Any]:
+    """Parse and validate one import line, raising ValueError with the reason."""
+    try:
+        row = json.loads(line)
+    except ValueError:
+        raise ValueError("Invalid JSON")
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object")
+    for field in ("username", "category", "key"):
+        if not isinstance(row.get(field), str) or not row[field]:
+            raise ValueError(f"Field '{field}' must be a non-empty string")
+    for field in ("value", "description"):
+        if row.get(field) is not None and not isinstance(row[field], str):
+            raise ValueError(f"Field '{field}' must be a string or null")
+    # Row columns of the value; SettingValidationError is a ValueError
+    row["columns"] = normalize_setting_value(row["category"], row["key"], row.get("value"))
+    return row
+
+
+@router.post(
+    "/{project_id}/settings/import",
+    response_model=UserSettingImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        }
+    }
+)
+async def import_project_settings(
+    project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Import settings into a project from newline-delimited JSON.
+
+    The body uses the export format and is parsed as it is received. Rows are
+    inserted in batches of ``IMPORT_BATCH_SIZE`` within a single transaction.
+    Rows that are malformed, hold a value their plugin template does not
+    accept, name a user who is not a member of the project, repeat an
+    earlier line, or conflict with an existing setting are rejected and
+    reported; existing settings are never overwritten.
+    """
+    await get_managed_project(db, project_id, current_user)
+
+    start = time.perf_counter()
+    insert = dialect_insert(db.get_bind())
+    stmt = insert(UserSetting.__table__).on_conflict_do_nothing(
+        index_elements=["user_id", "project_id", "category", "key"]
+    ).returning(
+        UserSetting.user_id,
+        UserSetting.category,
+        UserSetting.key
+    )
+
+    member_ids: Dict[str, int] = {}
+    non_members = set()
+    seen: Dict[Tuple[int, str, str], int] = {}
+    rejections: List[Dict[str, Any]] = []
+    counts = {"imported": 0, "rejected": 0}
+
+    def reject(line_number: int, reason: str):
+        counts["rejected"] += 1
+        if len(rejections) < MAX_REPORTED_REJECTIONS:
+            rejections.append({"line": line_number, "reason": reason})
+
+    async def insert_batch(batch: List[Tuple[int, Dict[str, Any]]]):
+        # Resolve usernames not seen in earlier batches with one query
+        unresolved = {row["username"] for _, row in batch} - member_ids.keys() - non_members
+        if unresolved:
+            result = await db.execute(select(User.username, User.id).join(
+                user_projects,
+                User.id == user_projects.c.user_id
+            ).filter(
+                user_projects.c.project_id == project_id,
+                User.username.in_(unresolved)
+            ))
+            member_ids.update(result.all())
+            non_members.update(unresolved - member_ids.keys())
+
+        params = []
+        lines = {}
+        for line_number, row in batch:
+            user_id = member_ids.get(row["username"])
+            if user_id is None:
+                reject(line_number, f"User '{row['username']}' is not a member of this project")
+                continue
+            identity = (user_id, row["category"], row["key"])
+            if identity in seen:
+                reject(line_number, f"Duplicate of line {seen[identity]}")
+                continue
+            seen[identity] = line_number
+            lines[identity] = line_number
+            params.append({
+                "user_id": user_id,
+                "project_id": project_id,
+                "category": row["category"],
+                "key": row["key"],
+                "description": row.get("description"),
+                **row["columns"],
+            })
+        if not params:
+            return
+
+        result = await db.execute(stmt, params)
+        inserted = {tuple(row) for row in result.all()}
+        counts["imported"] += len(inserted)
+        for identity, line_number in lines.items():
+            if identity not in inserted:
+                reject(line_number, "Conflicts with an existing setting")
+
+    try:
+        batch = []
+        line_number = 0
+        async for line in iter_lines(request):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                batch.append((line_number, parse_import_line(line)))
+            except ValueError as e:
+                reject(line_number, str(e))
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await insert_batch(batch)
+                batch = []
+        if batch:
+            await insert_batch(batch)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    invalidate_project_settings(project_id)
+
+    seconds = time.perf_counter() - start
+    return {
+        **counts,
+        "rejections": sorted(rejections, key=lambda rejection: rejection["line"]),
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(counts["imported"] / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+@router.get("/{project_id}/settings/query", response_model=List[UserSettingQueryMatch])
+async def query_project_settings(
+    project_id: int,
+    response: Response,
+    category: str,
+    key: str,
+    eq: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Find the users of a project whose setting ``category``/``key`` equals ``eq``.
+
+    ``eq`` is parsed with the template type of the key, so ``eq=1`` matches a
+    number setting stored as ``1.0`` and ``eq=yes`` a boolean stored as
+    ``true``. The filter is answered from the typed value indexes. Matches
+    are ordered by user id; pass ``X-Next-Cursor`` back as ``cursor`` for
+    the next page.
+    """
+    await get_managed_project(db, project_id, current_user)
+
+    query = select(
+        UserSetting.user_id,
+        User.username,
+        User.full_name,
+        UserSetting.value,
+        UserSetting.typed_value
+    ).join(
+        User,
+        User.id == UserSetting.user_id
+    ).filter(
+        UserSetting.project_id == project_id,
+        UserSetting.category == category,
+        UserSetting.key == key
+    )
+
+    # Compare on the same shadow column the stored values were written to
+    target = typed_value_columns(plugin_registry.get_value_type(category, key), eq)
+    if target["value_bool"] is not None:
+        query = query.filter(UserSetting.value_bool == target["value_bool"])
+    elif target["value_number"] is not None:
+        query = query.filter(UserSetting.value_number == target["value_number"])
+    elif target["value_string"] is not None:
+        query = query.filter(UserSetting.value_string == target["value_string"])
+    else:
+        # Strings too long to be indexed
+        query = query.filter(UserSetting.value == eq)
+
+    if cursor:
+        (last_user_id,) = decode_cursor(cursor, (int,))
+        query = query.filter(UserSetting.user_id > last_user_id)
+
+    result = await db.execute(query.order_by(UserSetting.user_id).limit(limit))
+    matches = result.all()
+    set_next_cursor(response, matches, limit, lambda match: (match.user_id,))
+    return matches
+
+
+def matches_default(value_type: Optional[str], raw: Optional[str], default: Any) -> bool:
+    """Whether a stored value equals a template default once parsed with the template type."""
+    if raw is None or raw == "":
+        return default is None or default == ""
+    try:
+        return coerce_value(value_type, raw) == default
+    except ValueError:
+        return False
+
+
+@router.get("/{project_id}/settings/matrix")
+async def project_settings_matrix(
+    project_id: int,
+    category: str,
+    diff: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the settings of every member of a project in one category as a users × keys grid.
+
+    The output is newline-delimited JSON. The first line holds the
+    ``category``, the template ``keys`` in template order and their
+    ``defaults``, followed by any other keys members have settings for, in key
+    order and with a ``null`` default. It is followed by one line per member, ordered by user ID,
+    with ``user_id``, ``username`` and ``cells``, the member's stored value
+    for each key; keys a member has no setting for are absent.
+
+    With ``diff``, only cells whose value differs from the template default
+    (compared with the template type, so ``4.0`` equals ``4``) are returned,
+    keys without a template are left out, and members without any such cell
+    are skipped. The grid is built from a single query ordered by user and
+    key, and written as it is read.
+    """
+    await get_managed_project(db, project_id, current_user)
+
+    defaults = plugin_registry.get_defaults(category)
+    if diff and not defaults:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No templates for category '{category}'"
+        )
+    value_types = {key: plugin_registry.get_value_type(category, key) for key in defaults}
+
+    header_defaults = dict(defaults)
+    if not diff:
+        # Stored keys without a template still get a column
+        stored_keys = await db.scalars(select(UserSetting.key).distinct().join(
+            user_projects,
+            and_(
+                user_projects.c.user_id == UserSetting.user_id,
+                user_projects.c.project_id == UserSetting.project_id
+            )
+        ).filter(
+            UserSetting.project_id == project_id,
+            UserSetting.category == category
+        ).order_by(UserSetting.key))
+        for key in stored_keys:
+            header_defaults.setdefault(key, None)
+
+    # Members without settings in the category still get a row
+    query = select(
+        user_projects.c.user_id,
+        User.username,
+        UserSetting.key,
+        UserSetting.value
+    ).select_from(user_projects).join(
+        User,
+        User.id == user_projects.c.user_id
+    ).outerjoin(
+        UserSetting,
+        and_(
+            UserSetting.user_id == user_projects.c.user_id,
+            UserSetting.project_id == user_projects.c.project_id,
+            UserSetting.category == category
+        )
+    ).filter(
+        user_projects.c.project_id == project_id
+    ).order_by(
+        user_projects.c.user_id, UserSetting.key
+    ).execution_options(yield_per=MATRIX_BATCH_SIZE)
+
+    def render_row(user_id: int, username: str, cells: Dict[str, Any]) -> str:
+        return json.dumps({"user_id": user_id, "username": username, "cells": cells}, ensure_ascii=False) + "\n"
+
+    async def generate_lines():
+        yield (json.dumps(
+            {"category": category, "keys": list(header_defaults), "defaults": header_defaults}, ensure_ascii=False
+        ) + "\n").encode("utf-8")
+
+        # The request's session is closed once this handler returns
+        async with session_scope() as session:
+            result = await session.stream(query)
+            current: Optional[Tuple[int, str]] = None
+            cells: Dict[str, Any] = {}
+            try:
+                async for rows in result.partitions(MATRIX_BATCH_SIZE):
+                    lines = []
+                    for user_id, username, key, value in rows:
+                        if current is None or current[0] != user_id:
+                            # Rows arrive grouped by user; a new user completes the previous row
+                            if current is not None and (cells or not diff):
+                                lines.append(render_row(*current, cells))
+                            current, cells = (user_id, username), {}
+                        if key is None:
+                            continue
+                        if diff and (key not in defaults or matches_default(value_types[key], value, defaults[key])):
+                            continue
+                        cells[key] = value
+                    if lines:
+                        yield "".join(lines).encode("utf-8")
+                if current is not None and (cells or not diff):
+                    yield render_row(*current, cells).encode("utf-8")
+            finally:
+                await result.close()
+
+    return StreamingResponse(generate_lines(), media_type=NDJSON_MEDIA_TYPE)
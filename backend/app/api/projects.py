@@ -1,37 +1,124 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, insert, update, delete, func, literal, union_all, and_, or_, bindparam, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from app.core import get_db
-from app.models import User, Project, user_projects
-from app.schemas import ProjectCreate, ProjectResponse, ProjectUpdate
+from app.core import get_db, dialect_insert
+from app.models import User, Project, UserSetting, user_projects
+from app.schemas import (
+    ProjectCreate,
+    ProjectResponse,
+    ProjectSummaryResponse,
+    ProjectDetailResponse,
+    ProjectUpdate,
+    ProjectMemberResponse,
+    ProjectMembersAddRequest,
+    ProjectMembersRemoveRequest,
+    ProjectMembersResult,
+    ProjectRole,
+)
 from .auth import get_current_user
+from .pagination import decode_cursor, set_next_cursor
+from .responses import ListSerializer, list_response
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+project_list_serializer = ListSerializer(ProjectSummaryResponse)
+member_list_serializer = ListSerializer(ProjectMemberResponse)
 
-@router.get("/", response_model=List[ProjectResponse])
-def list_projects(
-    db: Session = Depends(get_db),
+MANAGER_ROLES = ("owner", "admin")
+
+# Relationships the detail view can include, each loaded with one extra
+# SELECT ... IN query instead of a lazy load per access
+PROJECT_DETAIL_LOADERS = {
+    "creator": selectinload(Project.creator),
+    "members": selectinload(Project.members),
+}
+
+
+async def get_project_counts(
+    db: AsyncSession,
+    user_id: int,
+    project_ids: Sequence[int]
+) -> Dict[int, Tuple[int, Dict[str, int]]]:
+    """Return ``(member count, the user's setting count per category)`` by project id.
+
+    Both are computed by one query: the member counts grouped by project and
+    the setting counts grouped by project and category, combined with UNION
+    ALL. Member rows carry a NULL category.
+    """
+    members = select(
+        user_projects.c.project_id,
+        literal(None, String).label("category"),
+        func.count().label("count")
+    ).filter(
+        user_projects.c.project_id.in_(project_ids)
+    ).group_by(user_projects.c.project_id)
+    settings_per_category = select(
+        UserSetting.project_id,
+        UserSetting.category,
+        func.count()
+    ).filter(
+        UserSetting.user_id == user_id,
+        UserSetting.project_id.in_(project_ids)
+    ).group_by(UserSetting.project_id, UserSetting.category)
+
+    counts = {project_id: (0, {}) for project_id in project_ids}
+    result = await db.execute(union_all(members, settings_per_category))
+    for project_id, category, count in result.all():
+        member_count, setting_counts = counts[project_id]
+        if category is None:
+            counts[project_id] = (count, setting_counts)
+        else:
+            setting_counts[category] = count
+    return counts
+
+
+@router.get("/", response_model=List[ProjectSummaryResponse])
+async def list_projects(
+    include_counts: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all projects the current user has access to."""
-    # Get projects where user is a member or creator
-    projects = db.query(Project).join(
+    """List all projects the current user has access to, with the user's role in each.
+    
+    With ``include_counts``, each project also carries its member count and
+    the number of the current user's settings per category, computed for all
+    listed projects at once.
+    """
+    # Get projects where user is a member or creator. Only the columns of the
+    # response are selected, and the rows go to the serializer as plain dicts
+    result = await db.execute(select(
+        Project.id,
+        Project.name,
+        Project.description,
+        Project.created_by,
+        Project.is_active,
+        Project.created_at,
+        Project.updated_at,
+        user_projects.c.role
+    ).join(
         user_projects,
         Project.id == user_projects.c.project_id
     ).filter(
         user_projects.c.user_id == current_user.id,
         Project.is_active == True
-    ).all()
+    ))
+    projects = [dict(row._mapping) for row in result.all()]
     
-    return projects
+    if include_counts and projects:
+        counts = await get_project_counts(db, current_user.id, [project["id"] for project in projects])
+        for project in projects:
+            project["member_count"], project["setting_counts"] = counts[project["id"]]
+    
+    return list_response(project_list_serializer, projects)
 
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     project_data: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new project."""
@@ -44,23 +131,22 @@ def create_project(
         )
         
         db.add(new_project)
-        db.flush()  # Flush to get the project ID
+        await db.flush()  # Flush to get the project ID
         
         # Add creator as owner in the association table
-        from sqlalchemy import insert
         stmt = insert(user_projects).values(
             user_id=current_user.id,
             project_id=new_project.id,
             role='owner'
         )
-        db.execute(stmt)
+        await db.execute(stmt)
         
-        db.commit()
-        db.refresh(new_project)
+        await db.commit()
+        await db.refresh(new_project)
         
         return new_project
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating project: {str(e)}")  # ログ出力を追加
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -68,48 +154,67 @@ def create_project(
         )
 
 
-@router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(
+@router.get("/{project_id}", response_model=ProjectDetailResponse)
+async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    include: List[str] = Query([]),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific project by ID."""
+    """Get a specific project by ID, with the current user's role.
+    
+    ``include`` names relationships to return as well (``creator``,
+    ``members``); each is eager-loaded with ``selectinload``.
+    """
+    unknown = sorted(set(include) - PROJECT_DETAIL_LOADERS.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(unknown)}"
+        )
+    
     # Check if user has access to this project
-    project = db.query(Project).join(
+    row = (await db.execute(select(Project, user_projects.c.role).join(
         user_projects,
         Project.id == user_projects.c.project_id
     ).filter(
         Project.id == project_id,
         user_projects.c.user_id == current_user.id
-    ).first()
+    ).options(
+        *(PROJECT_DETAIL_LOADERS[name] for name in set(include))
+    ))).first()
     
-    if not project:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found or access denied"
         )
     
-    return project
+    project, role = row
+    # Relationships that were not loaded are left out rather than lazy-loaded
+    return ProjectDetailResponse.model_validate(
+        {**ProjectResponse.model_validate(project).model_dump(), "role": role,
+         **{name: getattr(project, name) for name in set(include)}}
+    )
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
-def update_project(
+async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a specific project."""
     # Get project and check if user is owner or admin
-    project = db.query(Project).join(
+    project = await db.scalar(select(Project).join(
         user_projects,
         Project.id == user_projects.c.project_id
     ).filter(
         Project.id == project_id,
         user_projects.c.user_id == current_user.id,
         user_projects.c.role.in_(['owner', 'admin'])
-    ).first()
+    ))
     
     if not project:
         raise HTTPException(
@@ -121,28 +226,28 @@ def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
+async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete (deactivate) a specific project."""
     # Only project owner can delete
-    project = db.query(Project).join(
+    project = await db.scalar(select(Project).join(
         user_projects,
         Project.id == user_projects.c.project_id
     ).filter(
         Project.id == project_id,
         user_projects.c.user_id == current_user.id,
         user_projects.c.role == 'owner'
-    ).first()
+    ))
     
     if not project:
         raise HTTPException(
@@ -152,4 +257,241 @@ def delete_project(
     
     # Soft delete by setting is_active to False
     project.is_active = False
-    db.commit()
+    await db.commit()
+
+
+async def get_project_role(db: AsyncSession, project_id: int, current_user: User) -> Optional[str]:
+    """Return the current user's role in an active project, or None if not a member."""
+    return await db.scalar(select(user_projects.c.role).join(
+        Project,
+        Project.id == user_projects.c.project_id
+    ).filter(
+        user_projects.c.project_id == project_id,
+        user_projects.c.user_id == current_user.id,
+        Project.is_active == True
+    ))
+
+
+async def get_manager_role(db: AsyncSession, project_id: int, current_user: User) -> str:
+    """Return the current user's role in a project they own or administer."""
+    role = await get_project_role(db, project_id, current_user)
+    if role not in MANAGER_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found or insufficient permissions"
+        )
+    return role
+
+
+async def resolve_users(
+    db: AsyncSession,
+    project_id: int,
+    user_ids: Sequence[int],
+    usernames: Sequence[str],
+    active_only: bool
+) -> List[Any]:
+    """Resolve user IDs and usernames with one IN query.
+    
+    Returns ``(id, username, role)`` rows, ``role`` being the user's current
+    role in the project or None for non-members.
+    """
+    conditions = []
+    if user_ids:
+        conditions.append(User.id.in_(set(user_ids)))
+    if usernames:
+        conditions.append(User.username.in_(set(usernames)))
+    query = select(User.id, User.username, user_projects.c.role).outerjoin(
+        user_projects,
+        and_(
+            user_projects.c.user_id == User.id,
+            user_projects.c.project_id == project_id
+        )
+    ).filter(or_(*conditions))
+    if active_only:
+        query = query.filter(User.is_active == True)
+    result = await db.execute(query)
+    return result.all()
+
+
+async def ensure_owner_remains(db: AsyncSession, project_id: int):
+    """Reject a change that left a project without an owner; the caller rolls back."""
+    owners = await db.scalar(select(func.count()).select_from(user_projects).filter(
+        user_projects.c.project_id == project_id,
+        user_projects.c.role == "owner"
+    ))
+    if not owners:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A project must keep at least one owner"
+        )
+
+
+def owner_role_required():
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Only project owners can grant, revoke or remove the owner role"
+    )
+
+
+@router.get("/{project_id}/members", response_model=List[ProjectMemberResponse])
+async def list_project_members(
+    project_id: int,
+    response: Response,
+    role: Optional[ProjectRole] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the members of a project the current user belongs to, ordered by user ID.
+    
+    Pass ``X-Next-Cursor`` back as ``cursor`` for the next page.
+    """
+    if await get_project_role(db, project_id, current_user) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found or access denied"
+        )
+    
+    query = select(
+        user_projects.c.user_id,
+        User.username,
+        user_projects.c.role
+    ).join(
+        User,
+        User.id == user_projects.c.user_id
+    ).filter(
+        user_projects.c.project_id == project_id
+    )
+    if role is not None:
+        query = query.filter(user_projects.c.role == role)
+    if cursor:
+        (last_user_id,) = decode_cursor(cursor, (int,))
+        query = query.filter(user_projects.c.user_id > last_user_id)
+    
+    result = await db.execute(query.order_by(user_projects.c.user_id).limit(limit))
+    members = result.all()
+    set_next_cursor(response, members, limit, lambda member: (member.user_id,))
+    return list_response(member_list_serializer, members, response)
+
+
+@router.post("/{project_id}/members", response_model=ProjectMembersResult)
+async def add_project_members(
+    project_id: int,
+    request: ProjectMembersAddRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add users to a project by ID or username, or change the role of existing members.
+    
+    All users are resolved with one query and the new memberships inserted
+    with one executemany statement. Users that do not exist or are inactive
+    are skipped and reported. Only owners can grant or revoke the owner role.
+    """
+    caller_role = await get_manager_role(db, project_id, current_user)
+    
+    rows = await resolve_users(
+        db,
+        project_id,
+        [item.user_id for item in request.members if item.user_id is not None],
+        [item.username for item in request.members if item.username is not None],
+        active_only=True
+    )
+    by_id = {row.id: row for row in rows}
+    by_username = {row.username: row for row in rows}
+    
+    result = ProjectMembersResult()
+    requested: Dict[int, str] = {}  # user id -> role; later items win
+    for item in request.members:
+        if item.user_id is not None:
+            row = by_id.get(item.user_id)
+            if row is None:
+                result.unknown_user_ids.append(item.user_id)
+                continue
+        else:
+            row = by_username.get(item.username)
+            if row is None:
+                result.unknown_usernames.append(item.username)
+                continue
+        requested[row.id] = item.role
+    
+    current = {row.id: row.role for row in rows}
+    new_members = [
+        {"user_id": user_id, "project_id": project_id, "role": role}
+        for user_id, role in requested.items() if current[user_id] is None
+    ]
+    role_changes = [
+        {"member_id": user_id, "new_role": role}
+        for user_id, role in requested.items() if current[user_id] not in (None, role)
+    ]
+    touches_owner = any(member["role"] == "owner" for member in new_members) or any(
+        "owner" in (change["new_role"], current[change["member_id"]]) for change in role_changes
+    )
+    if touches_owner and caller_role != "owner":
+        raise owner_role_required()
+    
+    try:
+        if new_members:
+            insert_ = dialect_insert(db.get_bind())
+            await db.execute(
+                insert_(user_projects).on_conflict_do_nothing(index_elements=["user_id", "project_id"]),
+                new_members
+            )
+        if role_changes:
+            await db.execute(update(user_projects).where(
+                user_projects.c.project_id == project_id,
+                user_projects.c.user_id == bindparam("member_id")
+            ).values(role=bindparam("new_role")), role_changes)
+            await ensure_owner_remains(db, project_id)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    
+    result.added = len(new_members)
+    result.updated = len(role_changes)
+    return result
+
+
+@router.delete("/{project_id}/members", response_model=ProjectMembersResult)
+async def remove_project_members(
+    project_id: int,
+    request: ProjectMembersRemoveRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove members from a project by ID or username.
+    
+    Users that are not members are skipped and reported. Their settings in
+    the project are kept. Only owners can remove owners, and the last owner
+    cannot be removed.
+    """
+    caller_role = await get_manager_role(db, project_id, current_user)
+    
+    rows = await resolve_users(db, project_id, request.user_ids, request.usernames, active_only=False)
+    members = {row.id: row.role for row in rows if row.role is not None}
+    member_names = {row.username for row in rows if row.role is not None}
+    
+    result = ProjectMembersResult(
+        unknown_user_ids=sorted(set(request.user_ids) - members.keys()),
+        unknown_usernames=sorted(set(request.usernames) - member_names),
+    )
+    if not members:
+        return result
+    if caller_role != "owner" and "owner" in members.values():
+        raise owner_role_required()
+    
+    try:
+        await db.execute(delete(user_projects).where(
+            user_projects.c.project_id == project_id,
+            user_projects.c.user_id.in_(members)
+        ))
+        if "owner" in members.values():
+            await ensure_owner_remains(db, project_id)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    
+    result.removed = len(members)
+    return result
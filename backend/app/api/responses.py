@@ -0,0 +1,53 @@
+"""Fast serialization path for list responses.
+
+By default FastAPI validates the returned ORM objects against the
+``response_model``, converts them to plain Python data and encodes that with
+the json module. With ``FAST_RESPONSES`` enabled, list endpoints instead
+return bytes produced by a ``TypeAdapter`` compiled once at import: pydantic
+validates the ORM attributes and writes JSON directly in a single pass.
+"""
+
+from typing import Any, Optional, Sequence, List
+
+from fastapi import Response
+from pydantic import TypeAdapter, create_model
+
+from app.core import settings
+
+
+class ListSerializer:
+    """Precompiled validator and JSON serializer for ``List[model]``.
+
+    ``trusted_fields`` maps field names to plain types replacing types whose
+    validation is redundant for stored rows, such as ``EmailStr`` (checked on
+    write, and far more expensive than the rest of the row).
+    """
+
+    def __init__(self, model, **trusted_fields):
+        if trusted_fields:
+            model = create_model(
+                f"Stored{model.__name__}",
+                __base__=model,
+                **{
+                    name: (type_, ... if model.model_fields[name].is_required() else model.model_fields[name].default)
+                    for name, type_ in trusted_fields.items()
+                }
+            )
+        self.adapter = TypeAdapter(List[model])
+
+    def render(self, items: Sequence[Any]) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(items, from_attributes=True))
+
+
+def list_response(serializer: ListSerializer, items: Sequence[Any], response: Optional[Response] = None):
+    """Return ``items`` for FastAPI to serialize, or a pre-rendered response on the fast path.
+
+    Headers set on the injected ``response`` (e.g. the pagination cursor) are
+    carried over, as FastAPI only merges them into responses it builds itself.
+    """
+    if not settings.FAST_RESPONSES:
+        return items
+    rendered = Response(content=serializer.render(items), media_type="application/json")
+    if response is not None:
+        rendered.headers.raw.extend(response.headers.raw)
+    return rendered
@@ -1,51 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
 
-from app.core import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
+
+from app.core import get_db, dialect_insert, settings as app_settings, settings_events, settings_channel
+from app.core.events import EVICTED
 from app.models import User, UserSetting
-from app.schemas import UserSettingCreate, UserSettingResponse, UserSettingUpdate
+from app.schemas import (
+    UserSettingCreate,
+    UserSettingResponse,
+    UserSettingUpdate,
+    UserSettingBulkRequest,
+    UserSettingBulkResult,
+)
+from app.plugins import (
+    SettingValidationError,
+    normalize_setting_value,
+    normalize_setting_values,
+)
 from .auth import get_current_user
+from .defaults import resolve_effective_settings, resolve_all_effective_settings, invalidate_user_settings
+from .pagination import decode_cursor, set_next_cursor
+from .responses import ListSerializer, list_response
 
 router = APIRouter(prefix="/settings", tags=["Settings"])
 
+setting_list_serializer = ListSerializer(UserSettingResponse)
+
+
+# Rejected values listed individually in the error of a bulk save
+MAX_REPORTED_INVALID = 20
+
+
+def validate_value(category: str, key: str, value: Optional[str]) -> Dict[str, Any]:
+    """Return the row columns of a value, rejecting it with 422 if its template or plugin does not accept it."""
+    try:
+        return normalize_setting_value(category, key, value)
+    except SettingValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+async def publish_setting_change(event: str, setting: UserSetting):
+    """Publish a committed setting to the change feed of its owner."""
+    await settings_events.publish(
+        settings_channel(setting.project_id, setting.user_id),
+        event,
+        UserSettingResponse.model_validate(setting).model_dump(mode="json")
+    )
+
 
 @router.get("/", response_model=List[UserSettingResponse])
-def list_user_settings(
+async def list_user_settings(
+    response: Response,
     project_id: int,
     category: str = None,
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all settings for the current user in a specific project, optionally filtered by category."""
-    query = db.query(UserSetting).filter(
+    """List all settings for the current user in a specific project, optionally filtered by category.
+    
+    Settings are ordered by (category, key, id). Without ``limit`` every row is
+    returned; with it, pass the ``X-Next-Cursor`` response header back as
+    ``cursor`` to fetch the next page.
+    """
+    query = select(UserSetting).filter(
         UserSetting.user_id == current_user.id,
         UserSetting.project_id == project_id
-    )
+    ).order_by(UserSetting.category, UserSetting.key, UserSetting.id)
     
     if category:
         query = query.filter(UserSetting.category == category)
     
-    settings = query.all()
-    return settings
+    if cursor:
+        last = decode_cursor(cursor, (str, str, int))
+        query = query.filter(tuple_(UserSetting.category, UserSetting.key, UserSetting.id) > tuple_(*last))
+    
+    if limit:
+        query = query.limit(limit)
+    
+    result = await db.scalars(query)
+    settings = result.all()
+    set_next_cursor(response, settings, limit, lambda setting: (setting.category, setting.key, setting.id))
+    return list_response(setting_list_serializer, settings, response)
+
+
+@router.get("/effective", response_model=Dict[str, Dict[str, Any]])
+async def get_effective_settings(
+    project_id: int,
+    category: str = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the effective settings per category.
+    
+    Plugin template defaults are overlaid with the studio, project, section and
+    unit defaults and then the user's stored values. Values are typed
+    according to the plugin template (``1.5``, ``true``), whichever layer they
+    come from. Without ``category``, every category is resolved with a single
+    query.
+    """
+    from app.models import Project, user_projects
+    project_access = await db.scalar(select(Project.id).join(
+        user_projects,
+        Project.id == user_projects.c.project_id
+    ).filter(
+        Project.id == project_id,
+        user_projects.c.user_id == current_user.id
+    ))
+    
+    if not project_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this project"
+        )
+    
+    if category:
+        return {category: await resolve_effective_settings(db, current_user, project_id, category)}
+    return await resolve_all_effective_settings(db, current_user, project_id)
+
+
+@router.get("/stream")
+async def stream_user_settings(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Push changes to the current user's settings in a project as server-sent events.
+    
+    Events are ``created``, ``updated`` and ``deleted`` (the setting) and
+    ``bulk`` (``{"items": [...]}``, one per bulk save). A comment line is sent
+    every ``EVENT_KEEPALIVE_SECONDS``. A client that does not keep up receives
+    an ``evicted`` event and the stream ends; it should reload its settings
+    and reconnect.
+    """
+    from app.models import Project, user_projects
+    project_access = await db.scalar(select(Project.id).join(
+        user_projects,
+        Project.id == user_projects.c.project_id
+    ).filter(
+        Project.id == project_id,
+        user_projects.c.user_id == current_user.id
+    ))
+    
+    if not project_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this project"
+        )
+    
+    channel = settings_channel(project_id, current_user.id)
+    
+    async def event_stream():
+        with settings_events.subscribe(channel) as subscription:
+            yield f"retry: 3000\n: subscribed to {channel}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), app_settings.EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is EVICTED:
+                    yield "event: evicted\ndata: {}\n\n"
+                    return
+                yield message
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/", response_model=UserSettingResponse, status_code=status.HTTP_201_CREATED)
-def create_user_setting(
+async def create_user_setting(
     setting_data: UserSettingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new setting for the current user."""
+    columns = validate_value(setting_data.category, setting_data.key, setting_data.value)
+    
     # Verify user has access to the project
     from app.models import Project, user_projects
-    project_access = db.query(Project).join(
+    project_access = await db.scalar(select(Project.id).join(
         user_projects,
         Project.id == user_projects.c.project_id
     ).filter(
         Project.id == setting_data.project_id,
         user_projects.c.user_id == current_user.id
-    ).first()
+    ))
     
     if not project_access:
         raise HTTPException(
@@ -54,12 +205,12 @@ def create_user_setting(
         )
     
     # Check if setting already exists
-    existing_setting = db.query(UserSetting).filter(
+    existing_setting = await db.scalar(select(UserSetting.id).filter(
         UserSetting.user_id == current_user.id,
         UserSetting.project_id == setting_data.project_id,
         UserSetting.category == setting_data.category,
         UserSetting.key == setting_data.key
-    ).first()
+    ))
     
     if existing_setting:
         raise HTTPException(
@@ -72,28 +223,148 @@ def create_user_setting(
         project_id=setting_data.project_id,
         category=setting_data.category,
         key=setting_data.key,
-        value=setting_data.value,
-        description=setting_data.description
+        description=setting_data.description,
+        **columns
     )
     
     db.add(new_setting)
-    db.commit()
-    db.refresh(new_setting)
+    await db.commit()
+    await db.refresh(new_setting)
+    
+    invalidate_user_settings(current_user.id, new_setting.project_id, new_setting.category)
+    await publish_setting_change("created", new_setting)
     
     return new_setting
 
 
+@router.post("/bulk", response_model=List[UserSettingBulkResult])
+async def bulk_upsert_user_settings(
+    bulk_data: UserSettingBulkRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create or update many settings for the current user in a single transaction."""
+    seen = set()
+    for item in bulk_data.items:
+        identity = (item.project_id, item.category, item.key)
+        if identity in seen:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Duplicate setting with category '{item.category}' and key '{item.key}' in request"
+            )
+        seen.add(identity)
+    
+    # Every value is checked before any query is made
+    columns, errors = normalize_setting_values(
+        (item.category, item.key, item.value) for item in bulk_data.items
+    )
+    if errors:
+        reported = "; ".join(f"item {index}: {error}" for index, error in errors[:MAX_REPORTED_INVALID])
+        if len(errors) > MAX_REPORTED_INVALID:
+            reported += f"; and {len(errors) - MAX_REPORTED_INVALID} more"
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{len(errors)} invalid setting value(s): {reported}"
+        )
+    
+    # Verify user has access to every referenced project with one query
+    from app.models import Project, user_projects
+    project_ids = {item.project_id for item in bulk_data.items}
+    result = await db.scalars(select(Project.id).join(
+        user_projects,
+        Project.id == user_projects.c.project_id
+    ).filter(
+        Project.id.in_(project_ids),
+        user_projects.c.user_id == current_user.id
+    ))
+    accessible_ids = set(result.all())
+    
+    if accessible_ids != project_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this project"
+        )
+    
+    # Upsert on uq_user_project_category_key; rows that were updated get updated_at set
+    insert = dialect_insert(db.get_bind())
+    stmt = insert(UserSetting.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "project_id", "category", "key"],
+        set_={
+            "value": stmt.excluded.value,
+            "typed_value": stmt.excluded.typed_value,
+            "value_number": stmt.excluded.value_number,
+            "value_bool": stmt.excluded.value_bool,
+            "value_string": stmt.excluded.value_string,
+            "description": stmt.excluded.description,
+            "updated_at": func.now(),
+        }
+    ).returning(
+        UserSetting.id,
+        UserSetting.project_id,
+        UserSetting.category,
+        UserSetting.key,
+        UserSetting.updated_at,
+        sort_by_parameter_order=True
+    )
+    
+    params = [
+        {
+            "user_id": current_user.id,
+            "project_id": item.project_id,
+            "category": item.category,
+            "key": item.key,
+            "description": item.description,
+            **item_columns,
+        }
+        for item, item_columns in zip(bulk_data.items, columns)
+    ]
+    
+    try:
+        result = await db.execute(stmt, params)
+        rows = result.all()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    
+    results = [
+        {
+            "id": row.id,
+            "project_id": row.project_id,
+            "category": row.category,
+            "key": row.key,
+            "status": "created" if row.updated_at is None else "updated",
+        }
+        for row in rows
+    ]
+    
+    for project_id, category in {(item.project_id, item.category) for item in bulk_data.items}:
+        invalidate_user_settings(current_user.id, project_id, category)
+    
+    # One event per project rather than per row, so a large save cannot overflow subscriber queues
+    changes: Dict[int, List[Dict[str, Any]]] = {}
+    for item, result, item_columns in zip(bulk_data.items, results, columns):
+        changes.setdefault(item.project_id, []).append(
+            {**result, "value": item_columns["value"], "description": item.description}
+        )
+    for project_id, items in changes.items():
+        await settings_events.publish(settings_channel(project_id, current_user.id), "bulk", {"items": items})
+    
+    return results
+
+
 @router.get("/{setting_id}", response_model=UserSettingResponse)
-def get_user_setting(
+async def get_user_setting(
     setting_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific setting by ID."""
-    setting = db.query(UserSetting).filter(
+    setting = await db.scalar(select(UserSetting).filter(
         UserSetting.id == setting_id,
         UserSetting.user_id == current_user.id
-    ).first()
+    ))
     
     if not setting:
         raise HTTPException(
@@ -105,17 +376,17 @@ def get_user_setting(
 
 
 @router.put("/{setting_id}", response_model=UserSettingResponse)
-def update_user_setting(
+async def update_user_setting(
     setting_id: int,
     setting_data: UserSettingUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a specific setting."""
-    setting = db.query(UserSetting).filter(
+    setting = await db.scalar(select(UserSetting).filter(
         UserSetting.id == setting_id,
         UserSetting.user_id == current_user.id
-    ).first()
+    ))
     
     if not setting:
         raise HTTPException(
@@ -124,26 +395,31 @@ def update_user_setting(
         )
     
     update_data = setting_data.dict(exclude_unset=True)
+    if "value" in update_data:
+        update_data.update(validate_value(setting.category, setting.key, update_data["value"]))
     for field, value in update_data.items():
         setattr(setting, field, value)
     
-    db.commit()
-    db.refresh(setting)
+    await db.commit()
+    await db.refresh(setting)
+    
+    invalidate_user_settings(current_user.id, setting.project_id, setting.category)
+    await publish_setting_change("updated", setting)
     
     return setting
 
 
 @router.delete("/{setting_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_setting(
+async def delete_user_setting(
     setting_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a specific setting."""
-    setting = db.query(UserSetting).filter(
+    setting = await db.scalar(select(UserSetting).filter(
         UserSetting.id == setting_id,
         UserSetting.user_id == current_user.id
-    ).first()
+    ))
     
     if not setting:
         raise HTTPException(
@@ -151,5 +427,12 @@ def delete_user_setting(
             detail="Setting not found"
         )
     
-    db.delete(setting)
-    db.commit()
+    await db.delete(setting)
+    await db.commit()
+    invalidate_user_settings(current_user.id, setting.project_id, setting.category)
+    
+    await settings_events.publish(
+        settings_channel(setting.project_id, setting.user_id),
+        "deleted",
+        {"id": setting.id, "project_id": setting.project_id, "category": setting.category, "key": setting.key}
+    )
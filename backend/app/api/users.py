@@ -1,35 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from app.core import get_db
 from app.models import User
 from app.schemas import UserResponse, UserUpdate
-from .auth import get_current_user
+from .auth import get_current_user, invalidate_principal
+from .defaults import invalidate_user_settings
+from .pagination import decode_cursor, set_next_cursor
+from .responses import ListSerializer, list_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+user_list_serializer = ListSerializer(UserResponse, email=str)
+
 
 @router.get("/", response_model=List[UserResponse])
-def list_users(
+async def list_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all users (requires authentication)."""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    """List all users (requires authentication).
+    
+    Pages are ordered by id. Pass the ``X-Next-Cursor`` response header back as
+    ``cursor`` to fetch the next page; ``skip`` is kept for compatibility.
+    """
+    query = select(User).order_by(User.id).limit(limit)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, (int,))
+        query = query.filter(User.id > last_id)
+    elif skip:
+        query = query.offset(skip)
+    
+    result = await db.scalars(query)
+    users = result.all()
+    set_next_cursor(response, users, limit, lambda user: (user.id,))
+    return list_response(user_list_serializer, users, response)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,10 +60,10 @@ def get_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update user information."""
@@ -53,7 +74,7 @@ def update_user(
             detail="Not authorized to update this user"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -65,16 +86,20 @@ def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.id)
+    if "section" in update_data or "unit" in update_data:
+        # Section and unit defaults that applied to the user may no longer apply
+        invalidate_user_settings(user.id)
     
     return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a user (soft delete by setting is_active to False)."""
@@ -85,7 +110,7 @@ def delete_user(
             detail="Not authorized to delete this user"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,4 +118,5 @@ def delete_user(
         )
     
     user.is_active = False
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
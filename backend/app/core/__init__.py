@@ -1,15 +1,68 @@
 """Core module initialization."""
 from .config import settings
-from .database import Base, get_db, engine
-from .security import create_access_token, decode_access_token, get_password_hash, verify_password
+from .database import Base, get_db, session_scope, engine, dialect_insert, dispose_engines, get_pool_status, ASYNC_MODE
+from .cache import TTLCache, TaggedCache
+from .compression import StreamingAwareGZipMiddleware
+from .metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    PROMETHEUS_CONTENT_TYPE,
+    http_metrics,
+    render_pool_metrics,
+    render_threadpool_metrics,
+)
+from .events import Broker, LocalBroker, EventHub, settings_events, settings_channel
+from .security import (
+    create_access_token,
+    decode_access_token,
+    verify_access_token,
+    RevocationList,
+    revoked_tokens,
+    get_password_hash,
+    verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    HashingOverloaded,
+    hash_stats,
+    start_hash_pool,
+    shutdown_hash_pool,
+)
 
 __all__ = [
     "settings",
     "Base",
     "get_db",
+    "session_scope",
     "engine",
+    "dialect_insert",
+    "dispose_engines",
+    "get_pool_status",
+    "ASYNC_MODE",
+    "TTLCache",
+    "TaggedCache",
+    "StreamingAwareGZipMiddleware",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "PROMETHEUS_CONTENT_TYPE",
+    "http_metrics",
+    "render_pool_metrics",
+    "render_threadpool_metrics",
+    "Broker",
+    "LocalBroker",
+    "EventHub",
+    "settings_events",
+    "settings_channel",
     "create_access_token",
     "decode_access_token",
+    "verify_access_token",
+    "RevocationList",
+    "revoked_tokens",
     "get_password_hash",
     "verify_password",
+    "get_password_hash_async",
+    "verify_password_async",
+    "HashingOverloaded",
+    "hash_stats",
+    "start_hash_pool",
+    "shutdown_hash_pool",
 ]
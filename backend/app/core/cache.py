@@ -0,0 +1,186 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class TTLCache:
+    """Thread-safe, bounded LRU cache whose entries expire after a TTL or an explicit deadline.
+
+    When the cache is full, expired entries are evicted first (soonest deadline
+    first); only if none have expired is the least recently used entry dropped.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._deadlines: List[Tuple[float, int, Hashable]] = []
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """Store value under key until ``expires_at`` (monotonic seconds), capped by the TTL."""
+        if self.maxsize <= 0:
+            return
+        now = time.monotonic()
+        deadline = now + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        if deadline <= now:
+            return
+        with self._lock:
+            self._entries[key] = (value, deadline)
+            self._entries.move_to_end(key)
+            self._counter += 1
+            heapq.heappush(self._deadlines, (deadline, self._counter, key))
+            if len(self._entries) > self.maxsize:
+                self._evict(now)
+            # Re-set and deleted keys leave stale heap items behind even while
+            # the cache is below maxsize, so the heap is bounded on every set
+            if len(self._deadlines) > 2 * self.maxsize + 64:
+                self._compact()
+
+    def delete(self, key: Hashable):
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._deadlines.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether key is stored (possibly expired); does not count as a hit or miss."""
+        with self._lock:
+            return key in self._entries
+
+    def _evict(self, now: float):
+        # Drop expired entries in deadline order; heap items whose entry was
+        # replaced or deleted are stale and simply discarded.
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._deadlines)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == deadline:
+                del self._entries[key]
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _compact(self):
+        # Rebuild the heap from the live entries only
+        self._deadlines = [
+            (entry[1], index, key)
+            for index, (key, entry) in enumerate(self._entries.items())
+        ]
+        heapq.heapify(self._deadlines)
+        self._counter = len(self._deadlines)
+
+
+class TaggedCache:
+    """``TTLCache`` whose entries carry tags, so every entry derived from some
+    piece of data can be dropped together when that data changes.
+
+    Every invalidation advances ``generation``. A value is only stored if no
+    invalidation happened since the caller read the generation before
+    computing it, so a result computed from data that changed meanwhile is
+    never cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._tag_refs = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.invalidated = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable], generation: int) -> bool:
+        """Store value under key with tags unless invalidated since ``generation``."""
+        with self._lock:
+            if generation != self.generation or self._cache.maxsize <= 0:
+                return False
+            self._cache.set(key, value)
+            for tag in tags:
+                keys = self._tags.setdefault(tag, set())
+                if key not in keys:
+                    keys.add(key)
+                    self._tag_refs += 1
+            # Entries evicted by the LRU leave stale references behind
+            if self._tag_refs > 4 * self._cache.maxsize + 64:
+                self._prune()
+            return True
+
+    def invalidate(self, tag: Hashable, predicate=None) -> int:
+        """Drop the entries carrying tag (and matching predicate(key), if given)."""
+        removed = 0
+        with self._lock:
+            self.generation += 1
+            keys = self._tags.get(tag)
+            if keys:
+                for key in [key for key in keys if predicate is None or predicate(key)]:
+                    keys.discard(key)
+                    self._tag_refs -= 1
+                    if key in self._cache:
+                        self._cache.delete(key)
+                        removed += 1
+                if not keys:
+                    del self._tags[tag]
+            self.invalidated += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._cache.clear()
+            self._tags.clear()
+            self._tag_refs = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._cache.stats(), "tags": len(self._tags), "invalidated": self.invalidated}
+
+    def _prune(self):
+        self._tags = {
+            tag: live
+            for tag, live in ((tag, {key for key in keys if key in self._cache}) for tag, keys in self._tags.items())
+            if live
+        }
+        self._tag_refs = sum(len(keys) for keys in self._tags.values())
@@ -0,0 +1,35 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Compressing these would buffer events inside the gzip stream until enough data accumulates
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """``GZipMiddleware`` that leaves server-sent event streams uncompressed.
+
+    The content type is only known once the application starts its response,
+    so the application's ``send`` is wrapped: the messages of a server-sent
+    event stream go straight to the client, all others to the gzip responder.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("Accept-Encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        async def app(scope: Scope, receive: Receive, send_with_gzip: Send) -> None:
+            target = send_with_gzip
+
+            async def routed_send(message: Message) -> None:
+                nonlocal target
+                if message["type"] == "http.response.start":
+                    content_type = Headers(raw=message["headers"]).get("content-type", "")
+                    if content_type.startswith(UNCOMPRESSED_MEDIA_TYPES):
+                        target = send
+                await target(message)
+
+            await self.app(scope, receive, routed_send)
+
+        await GZipResponder(app, self.minimum_size, compresslevel=self.compresslevel)(scope, receive, send)
@@ -14,11 +14,64 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./test.db"
+    POOL_SIZE: int = 5
+    MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: int = 30
+    POOL_RECYCLE: int = 1800  # seconds; -1 disables recycling
+    POOL_PRE_PING: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh tokens are rotated on every use; revoked access tokens are
+    # synced into each worker's memory at this interval
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REVOCATION_SYNC_SECONDS: int = 30
+    
+    # Argon2 cost parameters; hashes made with other values are upgraded on login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    
+    # Password hashing process pool (0 workers hashes in the threadpool instead)
+    HASH_WORKERS: int = 2
+    HASH_QUEUE_SIZE: int = 64
+    
+    # Verified access token cache; entries expire with their token (0 disables caching)
+    TOKEN_CACHE_SIZE: int = 4096
+    
+    # Authenticated principal cache (0 disables caching)
+    PRINCIPAL_CACHE_SIZE: int = 4096
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    
+    # Resolved effective settings per (user, project, category); the TTL bounds
+    # staleness across workers, as invalidation only reaches the local cache
+    EFFECTIVE_CACHE_SIZE: int = 10000
+    EFFECTIVE_CACHE_TTL_SECONDS: int = 300
+    
+    # Settings change feed (server-sent events)
+    EVENT_QUEUE_SIZE: int = 100  # queued events per subscriber before it is evicted
+    EVENT_KEEPALIVE_SECONDS: int = 15
+    
+    # Response encoding: FAST_RESPONSES renders list responses with precompiled
+    # pydantic serializers and all other JSON with orjson; GZIP_MINIMUM_SIZE=0 disables gzip
+    FAST_RESPONSES: bool = False
+    GZIP_MINIMUM_SIZE: int = 1024  # bytes
+    GZIP_COMPRESSLEVEL: int = 6
+    
+    # Per-route request metrics served at /metrics (Prometheus text format)
+    METRICS_ENABLED: bool = True
+    
+    # DCC plugin discovery: entry point group of installed plugin packages and an
+    # optional directory of plugin modules (both rescanned by the admin reload endpoint)
+    PLUGIN_ENTRY_POINT_GROUP: str = "archi.plugins"
+    PLUGINS_DIR: str = ""
+    
+    # Studio administrators (comma-separated usernames): manage studio, section and unit defaults
+    ADMIN_USERNAMES: str = ""
     
     # CORS - stored as string to avoid JSON parsing issues
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -1,18 +1,264 @@
+import time
+from contextlib import asynccontextmanager
+
+import anyio
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
 from .config import settings
+from .pool import (
+    PoolStats,
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    install_connect_counter,
+    install_sqlite_pragmas,
+)
+
+# Async drivers and the sync driver used for DDL/scripts against the same database
+ASYNC_DRIVERS = {
+    "postgresql+asyncpg": "postgresql",
+    "sqlite+aiosqlite": "sqlite",
+}
+
+
+def is_async_url(url: str) -> bool:
+    """Return True if the database URL names an async driver."""
+    return make_url(url).drivername in ASYNC_DRIVERS
+
+
+def to_sync_url(url: str) -> str:
+    """Return the sync-driver equivalent of a database URL."""
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+
+def is_sqlite_memory_url(url: str) -> bool:
+    """Return True for in-memory SQLite URLs, which cannot use a queue pool."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, async_driver: bool = False) -> dict:
+    """Return ``create_engine`` keyword arguments for the configured pool."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if is_sqlite_memory_url(url):
+            return options
+    else:
+        options = {}
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        pool_size=settings.POOL_SIZE,
+        max_overflow=settings.MAX_OVERFLOW,
+        pool_timeout=settings.POOL_TIMEOUT,
+        pool_recycle=settings.POOL_RECYCLE,
+        pool_pre_ping=settings.POOL_PRE_PING,
+    )
+    return options
+
+
+def configure_engine(sync_engine):
+    """Install connection hooks on a (sync view of an) engine."""
+    install_connect_counter(sync_engine)
+    if sync_engine.dialect.name == "sqlite" and not is_sqlite_memory_url(str(sync_engine.url)):
+        install_sqlite_pragmas(sync_engine, settings.SQLITE_BUSY_TIMEOUT_MS, settings.SQLITE_MMAP_SIZE)
+
+
+ASYNC_MODE = is_async_url(settings.DATABASE_URL)
+SYNC_DATABASE_URL = to_sync_url(settings.DATABASE_URL)
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {})
+engine = create_engine(SYNC_DATABASE_URL, **engine_options(SYNC_DATABASE_URL))
+configure_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if ASYNC_MODE:
+    async_engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, async_driver=True))
+    configure_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency for getting database session."""
-    db = SessionLocal()
+def pool_capacity(pool):
+    """Return the maximum number of connections a pool hands out, or None if unbounded."""
+    if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+        return pool.size() + pool._max_overflow
+    return None
+
+
+class ThreadedStreamResult:
+    """Awaitable facade over an unbuffered sync ``Result``, mirroring ``AsyncResult``."""
+
+    def __init__(self, result):
+        self.sync_result = result
+
+    async def partitions(self, size=None):
+        """Yield lists of rows, fetching each one from the cursor in the threadpool."""
+        while True:
+            rows = await run_in_threadpool(self.sync_result.fetchmany, size)
+            if not rows:
+                break
+            yield rows
+
+    async def close(self):
+        await run_in_threadpool(self.sync_result.close)
+
+
+class ThreadedSession:
+    """Awaitable facade over a sync ``Session`` mirroring the ``AsyncSession`` API.
+
+    Used when DATABASE_URL names a sync driver, so the async routers run
+    unchanged: every blocking call is executed in Starlette's threadpool.
+    Sessions are admitted through ``session_slots`` so that threadpool
+    workers never block waiting for a pooled connection held by a request
+    that itself needs a worker to make progress.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def get_bind(self):
+        return self.sync_session.get_bind()
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance):
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement, params=None, **kwargs):
+        execution_options = dict(kwargs.pop("execution_options", {}), prebuffer_rows=True)
+        return await run_in_threadpool(
+            self.sync_session.execute, statement, params, execution_options=execution_options, **kwargs
+        )
+
+    async def stream(self, statement, params=None, **kwargs):
+        """Execute with a server-side cursor; rows are fetched as they are consumed."""
+        execution_options = dict(kwargs.pop("execution_options", {}), stream_results=True)
+        result = await run_in_threadpool(
+            self.sync_session.execute, statement, params, execution_options=execution_options, **kwargs
+        )
+        return ThreadedStreamResult(result)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None):
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+def dialect_insert(bind):
+    """Return the dialect-specific ``insert`` construct supporting ON CONFLICT."""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect '{bind.dialect.name}'")
+    return insert
+
+
+def get_pool_status() -> dict:
+    """Return pool gauges and checkout statistics for the active engines.
+
+    Includes the session admission queue used in sync mode.
+    """
+    status = {"mode": "async" if ASYNC_MODE else "sync", "pools": {}}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.pool if async_engine else None)):
+        if pool is not None and hasattr(pool, "status_dict"):
+            status["pools"][name] = pool.status_dict()
+    if session_slots is not None:
+        admissions = admission_stats.snapshot()
+        status["session_slots"] = {
+            "capacity": _capacity,
+            "available": session_slots.value,
+            "admissions": admissions["checkouts"],
+            "wait_seconds_total": admissions["checkout_wait_seconds_total"],
+            "wait_seconds_max": admissions["checkout_wait_seconds_max"],
+        }
+    return status
+
+
+async def dispose_engines():
+    """Close pooled connections of the sync and async engines."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
+_capacity = pool_capacity(engine.pool)
+session_slots = anyio.Semaphore(_capacity) if _capacity and not ASYNC_MODE else None
+admission_stats = PoolStats()
+
+
+@asynccontextmanager
+async def session_scope():
+    """Open a database session outside of request dependency injection.
+
+    Used by streaming responses, whose body is produced after the request's
+    ``get_db`` session has already been closed.
+    """
+    if ASYNC_MODE:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    if session_slots is not None:
+        start = time.perf_counter()
+        await session_slots.acquire()
+        admission_stats.record_checkout(time.perf_counter() - start, 0)
+    db = ThreadedSession(SessionLocal(expire_on_commit=False))
     try:
         yield db
     finally:
-        db.close()
+        try:
+            await db.close()
+        finally:
+            if session_slots is not None:
+                session_slots.release()
+                admission_stats.record_checkin()
+
+
+async def get_db():
+    """Dependency for getting database session."""
+    async with session_scope() as db:
+        yield db
@@ -0,0 +1,224 @@
+"""
+In-process publish/subscribe hub for change notifications.
+
+Messages are published to named channels and fanned out to every subscriber
+of that channel. Each subscriber has a bounded queue; a subscriber that falls
+so far behind that its queue is full is evicted rather than allowed to grow
+memory or hold back the publisher.
+
+The hub hands published messages to a ``Broker``, which delivers them back to
+the hub of every worker. ``LocalBroker`` is the single-process stand-in; with
+several workers a broker over a shared transport (Redis pub/sub, PostgreSQL
+LISTEN/NOTIFY, ...) can be plugged in with ``EventHub.use_broker``.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Published messages are complete server-sent event frames, so they are
+# serialized once and shared by every subscriber and every worker.
+Deliver = Callable[[str, str], None]
+# Called with the event name and data of every message of a channel
+Listener = Callable[[str, Any], None]
+
+# Queued in place of the backlog of an evicted subscriber
+EVICTED = object()
+
+
+class Broker(ABC):
+    """Transport carrying published messages to the hubs of all workers."""
+
+    @abstractmethod
+    async def start(self, deliver: Deliver):
+        """Begin delivering messages of every channel to ``deliver`` (on the event loop)."""
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str):
+        """Send a message to all workers, including this one."""
+        pass
+
+    async def stop(self):
+        """Stop delivering messages."""
+
+
+class LocalBroker(Broker):
+    """Single-process broker: messages are delivered straight back to the local hub."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def publish(self, channel: str, message: str):
+        if self._deliver is not None:
+            self._deliver(channel, message)
+
+    async def stop(self):
+        self._deliver = None
+
+
+def parse_message(message: str) -> Tuple[str, Any]:
+    """Return the event name and data of a message built by ``EventHub.publish``."""
+    event, data = "", None
+    for line in message.splitlines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+    return event, data
+
+
+class Subscription:
+    """A subscriber's bounded queue of messages for one channel."""
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+    async def get(self):
+        """Wait for the next message; returns ``EVICTED`` once the subscriber was dropped."""
+        return await self.queue.get()
+
+
+class EventHub:
+    """Fans out messages published on a channel to that channel's subscribers."""
+
+    def __init__(self, broker: Optional[Broker] = None, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._broker = broker or LocalBroker()
+        self._started = False
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._listeners: Dict[str, List[Listener]] = {}
+        self._lock = threading.Lock()
+        self._published = 0
+        self._delivered = 0
+        self._evicted = 0
+
+    def use_broker(self, broker: Broker):
+        """Replace the broker; must be called before the hub is started."""
+        if self._started:
+            raise RuntimeError("Cannot replace the broker of a running event hub")
+        self._broker = broker
+
+    async def start(self):
+        if not self._started:
+            self._started = True
+            await self._broker.start(self._deliver)
+
+    async def stop(self):
+        if self._started:
+            self._started = False
+            await self._broker.stop()
+
+    async def publish(self, channel: str, event: str, data: Any):
+        """Publish an event to a channel.
+
+        Called after the change has been committed, so a broker failure is
+        logged instead of failing the request.
+        """
+        message = f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+        try:
+            await self.start()
+            await self._broker.publish(channel, message)
+        except Exception:
+            logger.exception("Failed to publish %s event on %s", event, channel)
+            return
+        with self._lock:
+            self._published += 1
+
+    @contextmanager
+    def subscribe(self, channel: str):
+        """Register a subscriber for the duration of the ``with`` block."""
+        subscription = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._remove(subscription)
+
+    def add_listener(self, channel: str, listener: Listener):
+        """Call ``listener(event, data)`` on the event loop for every message of a channel.
+
+        Unlike subscribers, listeners are not queued or evicted: they are
+        meant for control messages that every worker has to act on, and
+        should only schedule work rather than do it.
+        """
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(listener)
+
+    def remove_listener(self, channel: str, listener: Listener):
+        with self._lock:
+            listeners = self._listeners.get(channel)
+            if listeners and listener in listeners:
+                listeners.remove(listener)
+
+    def _remove(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def _deliver(self, channel: str, message: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            listeners = list(self._listeners.get(channel, ()))
+        if listeners:
+            event, data = parse_message(message)
+            for listener in listeners:
+                try:
+                    listener(event, data)
+                except Exception:
+                    logger.exception("Listener of %s failed on %s event", channel, event)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._evict(subscription)
+            else:
+                with self._lock:
+                    self._delivered += 1
+
+    def _evict(self, subscription: Subscription):
+        """Drop a subscriber whose queue is full, replacing its backlog with ``EVICTED``."""
+        self._remove(subscription)
+        subscription.evicted = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(EVICTED)
+        with self._lock:
+            self._evicted += 1
+        logger.warning("Evicted slow subscriber of %s", subscription.channel)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "channels": len(self._subscribers),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "published": self._published,
+                "delivered": self._delivered,
+                "evicted": self._evicted,
+            }
+
+
+# Change feed of user settings; channels are named by settings_channel()
+settings_events = EventHub(queue_size=settings.EVENT_QUEUE_SIZE)
+
+
+def settings_channel(project_id: int, user_id: int) -> str:
+    """Channel carrying changes to one user's settings in one project."""
+    return f"settings:{project_id}:{user_id}"
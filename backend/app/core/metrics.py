@@ -0,0 +1,208 @@
+"""
+Request metrics in the Prometheus text exposition format.
+
+``MetricsMiddleware`` records, per route, the number of responses by status
+class and a latency histogram, plus the number of requests in flight. The
+hot path does no label formatting and allocates no label tuples: each route
+gets a ``RouteMetrics`` with its label string rendered once and its bucket
+counters preallocated, looked up by the identity of the route object the
+router stores in the request scope. Counters are only touched from the event loop, so they need
+no locking.
+
+Histogram buckets are stored non-cumulatively and summed when scraped.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; requests slower than the last bound land in +Inf
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels: str) -> str:
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items())
+
+
+class RouteMetrics:
+    """Counters of one route, with its label set rendered up front."""
+
+    __slots__ = ("labels", "status_counts", "bucket_counts", "duration_sum", "count")
+
+    def __init__(self, labels: str, bucket_count: int):
+        self.labels = labels
+        self.status_counts = [0] * len(STATUS_CLASSES)
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.duration_sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Per-route request metrics and their Prometheus rendering."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_labels = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        self._routes: Dict[int, RouteMetrics] = {}
+        # Requests that matched no route share one series, so unknown paths cannot add series
+        self.unmatched = RouteMetrics(format_labels(method="", route="unmatched"), len(self.buckets))
+        self.in_flight = 0
+
+    def for_route(self, route: Any) -> RouteMetrics:
+        """Metrics of a matched route, created on its first request."""
+        # Routes define __eq__ and are not hashable; they live as long as the app
+        metrics = self._routes.get(id(route))
+        if metrics is None:
+            methods = ",".join(sorted(getattr(route, "methods", None) or ()))
+            metrics = RouteMetrics(
+                format_labels(method=methods, route=getattr(route, "path", str(route))),
+                len(self.buckets)
+            )
+            self._routes[id(route)] = metrics
+        return metrics
+
+    def observe(self, route: Optional[Any], status_code: int, seconds: float):
+        metrics = self.unmatched if route is None else self.for_route(route)
+        status_class = status_code // 100 - 1
+        if 0 <= status_class < len(STATUS_CLASSES):
+            metrics.status_counts[status_class] += 1
+        metrics.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        metrics.duration_sum += seconds
+        metrics.count += 1
+
+    def render(self) -> List[str]:
+        """Return the exposition lines of the request metrics."""
+        series = sorted(self._routes.values(), key=lambda metrics: metrics.labels)
+        series.append(self.unmatched)
+        lines = [
+            "# HELP http_requests_total Responses by route and status class.",
+            "# TYPE http_requests_total counter",
+        ]
+        for metrics in series:
+            for status_class, count in zip(STATUS_CLASSES, metrics.status_counts):
+                if count:
+                    lines.append(f'http_requests_total{{{metrics.labels},status="{status_class}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from receiving a request to the end of its response.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for metrics in series:
+            if not metrics.count:
+                continue
+            cumulative = 0
+            for bound, count in zip(self._bucket_labels, metrics.bucket_counts):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{metrics.labels},le="{bound}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{metrics.labels}}} {metrics.duration_sum!r}")
+            lines.append(f"http_request_duration_seconds_count{{{metrics.labels}}} {metrics.count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        return lines
+
+
+class MetricsMiddleware:
+    """Records the route, status and duration of every HTTP request."""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            # The router stores the matched route in the (shared) scope
+            registry.observe(scope.get("route"), status_code, time.perf_counter() - start)
+
+
+def _family(lines: List[str], name: str, kind: str, help_text: str, samples: Iterable):
+    """Append a metric family of ``(labels, value)`` samples."""
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{{{labels}}} {value}" if labels else f"{name} {value}" for labels, value in samples]
+
+
+# (status key, metric name, type, help) of each pool statistic
+POOL_METRICS = (
+    ("size", "db_pool_size", "gauge", "Connections the pool keeps open."),
+    ("checked_out", "db_pool_checked_out", "gauge", "Connections currently in use."),
+    ("checked_in", "db_pool_checked_in", "gauge", "Idle connections in the pool."),
+    ("overflow", "db_pool_overflow", "gauge", "Connections open beyond the pool size (negative while below it)."),
+    ("max_overflow", "db_pool_max_overflow", "gauge", "Connections allowed beyond the pool size."),
+    ("connects", "db_pool_connects_total", "counter", "New database connections opened."),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Connection checkouts."),
+    ("checkout_wait_seconds_total", "db_pool_checkout_wait_seconds_total", "counter",
+     "Time spent waiting for a connection."),
+)
+SESSION_SLOT_METRICS = (
+    ("capacity", "db_session_slots_capacity", "gauge", "Sessions admitted to the threadpool at once."),
+    ("available", "db_session_slots_available", "gauge", "Session admissions currently free."),
+    ("wait_seconds_total", "db_session_slot_wait_seconds_total", "counter", "Time sessions waited for admission."),
+)
+
+
+def render_pool_metrics(status: Dict[str, Any]) -> List[str]:
+    """Return exposition lines for the output of ``get_pool_status``."""
+    lines: List[str] = []
+    pools = [(format_labels(pool=name), values) for name, values in status["pools"].items()]
+    for key, name, kind, help_text in POOL_METRICS:
+        _family(lines, name, kind, help_text, [(labels, values[key]) for labels, values in pools if key in values])
+
+    slots = status.get("session_slots")
+    if slots is not None:
+        for key, name, kind, help_text in SESSION_SLOT_METRICS:
+            _family(lines, name, kind, help_text, [("", slots[key])])
+    return lines
+
+
+def render_threadpool_metrics() -> List[str]:
+    """Return exposition lines for the threadpool running sync endpoints and sessions.
+
+    Must be called from the event loop.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    total = limiter.total_tokens
+    busy = statistics.borrowed_tokens
+    lines: List[str] = []
+    _family(lines, "threadpool_threads_max", "gauge", "Worker threads the threadpool may run.", [("", total)])
+    _family(lines, "threadpool_threads_busy", "gauge", "Worker threads currently running a task.", [("", busy)])
+    _family(lines, "threadpool_tasks_waiting", "gauge", "Tasks queued for a free worker thread.",
+            [("", statistics.tasks_waiting)])
+    _family(lines, "threadpool_saturation", "gauge", "Fraction of worker threads busy.",
+            [("", busy / total if total else 0.0)])
+    return lines
+
+
+# Request metrics of this worker
+http_metrics = MetricsRegistry()
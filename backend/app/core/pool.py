@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Cumulative checkout counters and wait times for a connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+        self.peak_overflow = 0
+
+    def record_checkout(self, wait: float, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds += wait
+            if wait > self.max_checkout_wait_seconds:
+                self.max_checkout_wait_seconds = wait
+            if overflow > self.peak_overflow:
+                self.peak_overflow = overflow
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_wait_seconds_total": self.checkout_wait_seconds,
+                "checkout_wait_seconds_max": self.max_checkout_wait_seconds,
+                "peak_overflow": self.peak_overflow,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every pool checkout, including the wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        connection = super()._do_get()
+        self.stats.record_checkout(time.perf_counter() - start, self.overflow())
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self.stats.record_checkin()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def status_dict(self) -> Dict[str, Any]:
+        """Return live pool gauges together with the cumulative counters."""
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            **self.stats.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """``QueuePool`` with checkout statistics."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` with checkout statistics."""
+
+
+def install_connect_counter(sync_engine):
+    """Count new DBAPI connections opened by the engine's pool."""
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats = getattr(sync_engine.pool, "stats", None)
+        if stats is not None:
+            stats.record_connect()
+
+
+def install_sqlite_pragmas(sync_engine, busy_timeout_ms: int, mmap_size: int):
+    """Apply WAL journaling and related pragmas to every new SQLite connection.
+
+    WAL lets readers proceed while a writer holds the lock, and busy_timeout
+    makes concurrent writers wait instead of failing with "database is locked".
+    """
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        cursor.close()
@@ -1,11 +1,73 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Dict, Iterable, Optional, Tuple
+import anyio
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+from .cache import TTLCache
 from .config import settings
 
 # Use argon2 for password hashing (modern, secure algorithm)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+class HashingOverloaded(Exception):
+    """Raised when the password hashing admission queue is full or its workers are restarting."""
+
+
+class HashStats:
+    """Counters for password hashing queue wait and hash time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+
+    def record(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_seconds += queue_wait
+            self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait)
+            self.hash_seconds += hash_time
+            self.max_hash_seconds = max(self.max_hash_seconds, hash_time)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_seconds_total": self.queue_wait_seconds,
+                "queue_wait_seconds_max": self.max_queue_wait_seconds,
+                "hash_seconds_total": self.hash_seconds,
+                "hash_seconds_max": self.max_hash_seconds,
+            }
+
+
+hash_stats = HashStats()
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_slots: Optional[anyio.Semaphore] = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,22 +80,205 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _timed_verify_and_update(plain_password: str, hashed_password: str):
+    started = time.time()
+    result = pwd_context.verify_and_update(plain_password, hashed_password)
+    return result, started, time.time() - started
+
+
+def _timed_hash(password: str):
+    started = time.time()
+    result = pwd_context.hash(password)
+    return result, started, time.time() - started
+
+
+def start_hash_pool():
+    """Create the password hashing process pool and warm up its workers."""
+    global _hash_pool, _hash_slots
+    if settings.HASH_WORKERS <= 0:
+        return
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn: forking a process that already runs DB/threadpool threads is unsafe
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            # Kept when a broken pool is replaced, so admitted requests stay counted
+            if _hash_slots is None:
+                _hash_slots = anyio.Semaphore(settings.HASH_WORKERS + settings.HASH_QUEUE_SIZE)
+            for _ in range(settings.HASH_WORKERS):
+                _hash_pool.submit(time.time)
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died, so the next submission starts a new one."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is pool:
+            _hash_pool = None
+    # A broken pool has no work left to wait for
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_hash_pool():
+    """Stop the password hashing process pool; blocks until its workers exit."""
+    global _hash_pool, _hash_slots
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True, cancel_futures=True)
+            _hash_pool = None
+            _hash_slots = None
+
+
+async def _submit_hashing(fn, *args):
+    """Run a hashing function in the process pool, replacing the pool once if it broke.
+
+    Raises:
+        HashingOverloaded: if the pool broke again right after being replaced
+    """
+    for _ in range(2):
+        start_hash_pool()
+        pool = _hash_pool
+        try:
+            # Await the worker without holding a threadpool thread
+            return await asyncio.wrap_future(pool.submit(fn, *args))
+        except BrokenProcessPool:
+            # A worker was killed (e.g. by the OOM killer); every later submission would fail
+            _discard_broken_pool(pool)
+    raise HashingOverloaded("Password hashing workers are restarting")
+
+
+async def _run_hashing(fn, *args):
+    if settings.HASH_WORKERS <= 0:
+        submitted = time.time()
+        result, started, hash_time = await run_in_threadpool(fn, *args)
+        hash_stats.record(started - submitted, hash_time)
+        return result
+
+    start_hash_pool()
+    slots = _hash_slots
+    try:
+        slots.acquire_nowait()
+    except anyio.WouldBlock:
+        hash_stats.record_rejected()
+        raise HashingOverloaded("Password hashing queue is full")
+    try:
+        submitted = time.time()
+        result, started, hash_time = await _submit_hashing(fn, *args)
+        hash_stats.record(max(started - submitted, 0.0), hash_time)
+        return result
+    finally:
+        slots.release()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the hashing pool.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    uses outdated parameters and should be replaced.
+
+    Raises:
+        HashingOverloaded: if the admission queue is full or the workers are restarting
+    """
+    return await _run_hashing(_timed_verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool.
+
+    Raises:
+        HashingOverloaded: if the admission queue is full or the workers are restarting
+    """
+    return await _run_hashing(_timed_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+    """Create a JWT access token with a unique id (``jti``), so it can be revoked."""
     to_encode = data.copy()
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    from jose import jwt  # deferred: python-jose pulls in cryptography at import
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT access token."""
+def verify_access_token(token: str) -> Optional[dict]:
+    """Verify the signature and claims of a JWT access token and return its payload."""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         return None
+
+
+# Verified payloads keyed by a digest of the token. Clients send the same
+# token on every request until it expires, so most requests skip signature
+# verification; each entry expires together with its token.
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode and verify a JWT access token, reusing earlier verifications of it."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
+    payload = verify_access_token(token)
+    # Only valid tokens with an expiry are cached, so a flood of bad tokens cannot evict good ones
+    if payload is not None and isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(key, payload, expires_at=time.monotonic() + (payload["exp"] - time.time()))
+        return dict(payload)
+    return payload
+
+
+class RevocationList:
+    """Ids (``jti``) of access tokens revoked before their expiry, held in memory.
+
+    Checking a token is a dict lookup, so authenticated requests never query
+    the database for revocations. The list is filled by this worker's own
+    revocations and by a periodic ``merge`` of the revocations stored in the
+    database, so a token revoked by another worker is rejected here after at
+    most one sync interval. Entries are dropped once their token has expired.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}  # jti -> token expiry (epoch seconds)
+        self._lock = threading.Lock()
+        self.synced_at: Optional[float] = None
+        self.syncs = 0
+
+    def __contains__(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._expiry
+
+    def add(self, jti: str, expires_at: float):
+        """Revoke a token in this worker until ``expires_at`` (epoch seconds)."""
+        with self._lock:
+            self._expiry[jti] = expires_at
+
+    def merge(self, entries: Iterable[Tuple[str, float]]):
+        """Add synced ``(jti, expires_at)`` entries and drop expired ones."""
+        now = time.time()
+        with self._lock:
+            # Rebuilt and swapped so lookups never see a dict being resized
+            expiry = {jti: expires_at for jti, expires_at in self._expiry.items() if expires_at > now}
+            expiry.update((jti, expires_at) for jti, expires_at in entries if expires_at > now)
+            self._expiry = expiry
+            self.synced_at = now
+            self.syncs += 1
+
+    def stats(self) -> dict:
+        return {"revoked": len(self._expiry), "syncs": self.syncs, "synced_at": self.synced_at}
+
+
+# Revoked access tokens of this worker, synced from the revoked_tokens table
+revoked_tokens = RevocationList()
@@ -2,5 +2,7 @@
 from .user import User
 from .setting import UserSetting
 from .project import Project, user_projects
+from .setting_default import SettingDefault, DEFAULT_SCOPES
+from .token import RefreshToken, RevokedToken
 
-__all__ = ["User", "UserSetting", "Project", "user_projects"]
+__all__ = ["User", "UserSetting", "Project", "user_projects", "SettingDefault", "DEFAULT_SCOPES", "RefreshToken", "RevokedToken"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Table, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -11,7 +11,9 @@ user_projects = Table(
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
     Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
     Column('role', String, default='member'),  # owner, admin, member
-    Column('created_at', DateTime(timezone=True), server_default=func.now())
+    Column('created_at', DateTime(timezone=True), server_default=func.now()),
+    # The primary key serves lookups by user; this serves lookups by project
+    Index('ix_user_projects_project_id_user_id', 'project_id', 'user_id'),
 )
 
 
@@ -31,3 +33,11 @@ class Project(Base):
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_projects")
     members = relationship("User", secondary=user_projects, back_populates="projects")
     settings = relationship("UserSetting", back_populates="project", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index(
+            'ix_projects_created_by_active', 'created_by',
+            postgresql_where=text('is_active'),
+            sqlite_where=text('is_active = 1'),
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint, Index, JSON, Float, Boolean
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -11,9 +11,14 @@ class UserSetting(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    category = Column(String, index=True, nullable=False)  # e.g., "maya", "blender", "houdini", "general"
-    key = Column(String, index=True, nullable=False)  # e.g., "workspace_path", "render_engine"
+    category = Column(String, nullable=False)  # e.g., "maya", "blender", "houdini", "general"
+    key = Column(String, nullable=False)  # e.g., "workspace_path", "render_engine"
     value = Column(Text)  # JSON string or plain text value
+    # Derived from value using the plugin template type (see app/plugins/values.py)
+    typed_value = Column(JSON)
+    value_number = Column(Float)
+    value_bool = Column(Boolean)
+    value_string = Column(String)
     description = Column(Text)  # Optional description of the setting
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -22,6 +27,11 @@ class UserSetting(Base):
     user = relationship("User", back_populates="settings")
     project = relationship("Project", back_populates="settings")
     
+    # The unique constraint's index serves the per-user (user_id, project_id[, category]) lookups;
+    # the project-wide indexes serve queries across all users of a project, including
+    # filters on a key's value (ordered by user for pagination).
     __table_args__ = (
         UniqueConstraint('user_id', 'project_id', 'category', 'key', name='uq_user_project_category_key'),
+        Index('ix_user_settings_project_key_string', 'project_id', 'category', 'key', 'value_string', 'user_id'),
+        Index('ix_user_settings_project_key_number', 'project_id', 'category', 'key', 'value_number', 'user_id'),
     )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# Default scopes from the broadest to the most specific; per-user rows in
+# user_settings override all of them
+DEFAULT_SCOPES = ("studio", "project", "section", "unit")
+
+
+class SettingDefault(Base):
+    """Default setting value for every user within a scope.
+
+    ``target`` names the scope instance: empty for ``studio``, the project id
+    for ``project``, and the ``User.section`` / ``User.unit`` value for
+    ``section`` / ``unit``.
+    """
+    __tablename__ = "setting_defaults"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False)  # studio, project, section, unit
+    target = Column(String, nullable=False, default="")
+    category = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    value = Column(Text)
+    description = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Also serves the resolver's lookup of (scope, target) pairs within a category
+    __table_args__ = (
+        UniqueConstraint('scope', 'target', 'category', 'key', name='uq_setting_default_scope_key'),
+    )
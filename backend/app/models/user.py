@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -23,3 +23,11 @@ class User(Base):
     settings = relationship("UserSetting", back_populates="user", cascade="all, delete-orphan")
     created_projects = relationship("Project", foreign_keys="Project.created_by", back_populates="creator")
     projects = relationship("Project", secondary="user_projects", back_populates="members")
+    
+    __table_args__ = (
+        Index(
+            'ix_users_section_unit_active', 'section', 'unit',
+            postgresql_where=text('is_active'),
+            sqlite_where=text('is_active = 1'),
+        ),
+    )
@@ -1,19 +1,60 @@
 """Plugins module initialization."""
 
-from .base import DCCPlugin, DCCSettingTemplate, plugin_registry
-from .maya import MayaPlugin
-from .blender import BlenderPlugin
-from .houdini import HoudiniPlugin
+import importlib
+
+from app.core.config import settings
+
+from .base import (
+    DCCPlugin,
+    DCCSettingTemplate,
+    CatalogEntry,
+    PluginSpec,
+    PluginLoadError,
+    plugin_registry,
+)
+from .values import coerce_value, typed_value_columns, setting_value_columns
+from .validation import (
+    SettingValidator,
+    SettingValidationError,
+    normalize_setting_value,
+    normalize_setting_values,
+)
+from .discovery import BUILTIN_PLUGINS, builtin_plugins, entry_point_plugins, directory_plugins
+
+
+# Later sources override earlier ones, so an installed or dropped-in plugin can replace a built-in one
+plugin_registry.add_source(builtin_plugins)
+plugin_registry.add_source(entry_point_plugins(settings.PLUGIN_ENTRY_POINT_GROUP))
+if settings.PLUGINS_DIR:
+    plugin_registry.add_source(directory_plugins(settings.PLUGINS_DIR))
+
+
+def __getattr__(name):
+    # Built-in plugin classes are imported on access, not with the package
+    for reference in BUILTIN_PLUGINS.values():
+        module_name, _, class_name = reference.partition(":")
+        if class_name == name:
+            return getattr(importlib.import_module(module_name), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Register all plugins
-plugin_registry.register(MayaPlugin())
-plugin_registry.register(BlenderPlugin())
-plugin_registry.register(HoudiniPlugin())
 
 __all__ = [
     "DCCPlugin",
     "DCCSettingTemplate",
+    "CatalogEntry",
+    "PluginSpec",
+    "PluginLoadError",
     "plugin_registry",
+    "coerce_value",
+    "typed_value_columns",
+    "setting_value_columns",
+    "SettingValidator",
+    "SettingValidationError",
+    "normalize_setting_value",
+    "normalize_setting_values",
+    "builtin_plugins",
+    "entry_point_plugins",
+    "directory_plugins",
     "MayaPlugin",
     "BlenderPlugin",
     "HoudiniPlugin",
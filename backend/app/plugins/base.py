@@ -5,10 +5,19 @@ This module provides a framework for extending the application with
 custom DCC tool configuration templates and validators.
 """
 
+import hashlib
+import json
+import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Any, Iterable, List, NamedTuple, Optional
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from .validation import SettingValidator
+
+logger = logging.getLogger(__name__)
+
 
 class DCCSettingTemplate(BaseModel):
     """Template for a DCC tool setting."""
@@ -74,30 +83,267 @@ class DCCPlugin(ABC):
         return value
 
 
+class CatalogEntry(NamedTuple):
+    """Pre-serialized JSON document with its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def _catalog_entry(document: Any) -> CatalogEntry:
+    body = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return CatalogEntry(body=body, etag=f'"{hashlib.sha256(body).hexdigest()}"')
+
+
+class PluginSpec(NamedTuple):
+    """Metadata of a discovered plugin; ``load`` imports and instantiates it."""
+    name: str
+    source: str
+    load: Callable[[], DCCPlugin]
+
+
+class LoadedPlugin(NamedTuple):
+    """A plugin instance with everything derived from its templates."""
+    plugin: DCCPlugin
+    templates: List[DCCSettingTemplate]
+    template_data: List[Dict[str, Any]]
+    defaults: Dict[str, Any]
+    value_types: Dict[str, str]
+    validator: "SettingValidator"
+    document: CatalogEntry
+
+
+class PluginLoadError(Exception):
+    """One or more plugins failed to load."""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(f"{name}: {error}" for name, error in sorted(errors.items())))
+        self.errors = errors
+
+
+def _load_plugin(spec: PluginSpec) -> LoadedPlugin:
+    """Instantiate a plugin and precompute its templates, defaults, validator and catalog document."""
+    # Imported here: the validation module builds on the registry defined below
+    from .validation import SettingValidator
+
+    plugin = spec.load()
+    if not isinstance(plugin, DCCPlugin):
+        raise TypeError(f"{spec.source} did not produce a DCCPlugin")
+    if plugin.name != spec.name:
+        raise ValueError(f"{spec.source} is registered as '{spec.name}' but is named '{plugin.name}'")
+
+    templates = plugin.get_settings_template()
+    template_data = [template.model_dump(mode="json") for template in templates]
+    return LoadedPlugin(
+        plugin=plugin,
+        templates=templates,
+        template_data=template_data,
+        defaults={template.key: template.default_value for template in templates},
+        value_types={template.key: template.type for template in templates},
+        validator=SettingValidator(plugin, templates),
+        document=_catalog_entry({
+            "name": plugin.name,
+            "display_name": plugin.display_name,
+            "description": plugin.description,
+            "settings": template_data,
+        }),
+    )
+
+
+class _Generation:
+    """The discovered plugins of one (re)load and those instantiated so far."""
+
+    def __init__(self, specs: Dict[str, PluginSpec]):
+        self.specs = specs
+        self.loaded: Dict[str, LoadedPlugin] = {}
+        self.errors: Dict[str, str] = {}
+        self.plugins_entry: Optional[CatalogEntry] = None
+        self.templates_entry: Optional[CatalogEntry] = None
+
+
 class PluginRegistry:
-    """Registry for DCC plugins."""
+    """Registry for DCC plugins.
+    
+    Plugins are discovered from sources (the built-in plugins, installed
+    packages' entry points and a plugins directory) which only yield their
+    name and a loader, so discovery imports no plugin code. A plugin is
+    imported and instantiated on first access, and its templates are built
+    and serialized once at that point rather than on every request.
+    
+    ``reload`` discovers and loads every plugin into a new generation and
+    swaps it in with a single assignment: requests see either the old or
+    the new set of plugins, never a mix.
+    """
     
     def __init__(self):
-        self._plugins: Dict[str, DCCPlugin] = {}
+        self._sources: List[Callable[[], Iterable[PluginSpec]]] = []
+        self._registered: Dict[str, PluginSpec] = {}
+        self._generation: Optional[_Generation] = None
+        self._lock = threading.RLock()
+        self.reloads = 0
+    
+    def add_source(self, source: Callable[[], Iterable[PluginSpec]]):
+        """Add a callable yielding plugin specs; sources added later override earlier ones by name."""
+        with self._lock:
+            self._sources.append(source)
+            self._generation = None
     
     def register(self, plugin: DCCPlugin):
-        """Register a new plugin."""
-        self._plugins[plugin.name] = plugin
+        """Register a plugin instance directly; it is kept across reloads."""
+        source = f"{type(plugin).__module__}:{type(plugin).__qualname__}"
+        spec = PluginSpec(name=plugin.name, source=source, load=lambda: plugin)
+        loaded = _load_plugin(spec)
+        with self._lock:
+            self._registered[spec.name] = spec
+            generation = self._current()
+            generation.specs[spec.name] = spec
+            generation.loaded[spec.name] = loaded
+            generation.errors.pop(spec.name, None)
+            generation.plugins_entry = generation.templates_entry = None
+    
+    def _discover(self) -> _Generation:
+        specs: Dict[str, PluginSpec] = {}
+        for source in self._sources:
+            for spec in source():
+                if spec.name in specs:
+                    logger.warning("Plugin '%s' from %s overrides %s", spec.name, spec.source, specs[spec.name].source)
+                specs[spec.name] = spec
+        specs.update(self._registered)
+        return _Generation(specs)
+    
+    def _current(self) -> _Generation:
+        generation = self._generation
+        if generation is None:
+            with self._lock:
+                if self._generation is None:
+                    self._generation = self._discover()
+                generation = self._generation
+        return generation
+    
+    def _load(self, generation: _Generation, name: str) -> Optional[LoadedPlugin]:
+        loaded = generation.loaded.get(name)
+        if loaded is not None or name not in generation.specs:
+            return loaded
+        with self._lock:
+            if name in generation.loaded or name in generation.errors:
+                return generation.loaded.get(name)
+            try:
+                loaded = _load_plugin(generation.specs[name])
+            except Exception as e:
+                # A broken plugin is left out instead of failing every request that touches it
+                logger.exception("Failed to load plugin '%s' from %s", name, generation.specs[name].source)
+                generation.errors[name] = f"{type(e).__name__}: {e}"
+                return None
+            generation.loaded[name] = loaded
+            return loaded
+    
+    def _loaded(self, name: str) -> Optional[LoadedPlugin]:
+        return self._load(self._current(), name)
+    
+    def _load_all(self, generation: _Generation) -> List[LoadedPlugin]:
+        loaded = (self._load(generation, name) for name in list(generation.specs))
+        return [plugin for plugin in loaded if plugin is not None]
+    
+    def ensure_loaded(self):
+        """Discover plugins (metadata only; plugins are instantiated on first use)."""
+        self._current()
+    
+    def reload(self) -> Dict[str, str]:
+        """Rediscover and load every plugin, then swap the new set in atomically.
+        
+        Raises PluginLoadError, keeping the current plugins, if any plugin
+        fails to load. Returns the source of each plugin.
+        """
+        generation = self._discover()
+        self._load_all(generation)
+        if generation.errors:
+            raise PluginLoadError(generation.errors)
+        with self._lock:
+            self._generation = generation
+            self.reloads += 1
+        return {name: spec.source for name, spec in generation.specs.items()}
+    
+    def plugin_names(self) -> List[str]:
+        """Names of every discovered plugin, without instantiating any."""
+        return list(self._current().specs)
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Source and load state of every discovered plugin."""
+        generation = self._current()
+        return {
+            name: {
+                "source": spec.source,
+                "loaded": name in generation.loaded,
+                "error": generation.errors.get(name),
+            }
+            for name, spec in generation.specs.items()
+        }
     
     def get_plugin(self, name: str) -> Optional[DCCPlugin]:
         """Get a plugin by name."""
-        return self._plugins.get(name)
+        loaded = self._loaded(name)
+        return loaded.plugin if loaded else None
     
     def list_plugins(self) -> List[DCCPlugin]:
         """List all registered plugins."""
-        return list(self._plugins.values())
+        return [loaded.plugin for loaded in self._load_all(self._current())]
+    
+    def get_defaults(self, name: str) -> Dict[str, Any]:
+        """Get the precomputed default value of every template key for a plugin."""
+        loaded = self._loaded(name)
+        return dict(loaded.defaults) if loaded else {}
+    
+    def get_value_type(self, name: str, key: str) -> Optional[str]:
+        """Get the template type of a setting key, or None if the key has no template."""
+        loaded = self._loaded(name)
+        return loaded.value_types.get(key) if loaded else None
+    
+    def get_validator(self, name: str) -> Optional["SettingValidator"]:
+        """Get the validator table compiled from a plugin's templates, or None for unknown categories."""
+        loaded = self._loaded(name)
+        return loaded.validator if loaded else None
+    
+    def get_templates(self, name: str) -> List[DCCSettingTemplate]:
+        """Get the setting templates of a plugin built when it was loaded."""
+        loaded = self._loaded(name)
+        return loaded.templates if loaded else []
+    
+    def get_template_data(self, name: str) -> List[Dict[str, Any]]:
+        """Get the JSON-ready template dicts of a plugin (shared; do not mutate)."""
+        loaded = self._loaded(name)
+        return loaded.template_data if loaded else []
     
     def get_all_templates(self) -> Dict[str, List[DCCSettingTemplate]]:
         """Get all setting templates from all plugins."""
-        return {
-            plugin.name: plugin.get_settings_template()
-            for plugin in self._plugins.values()
-        }
+        return {loaded.plugin.name: loaded.templates for loaded in self._load_all(self._current())}
+    
+    def get_plugins_document(self) -> CatalogEntry:
+        """Serialized list of plugins for ``/dcc/plugins``."""
+        generation = self._current()
+        if generation.plugins_entry is None:
+            generation.plugins_entry = _catalog_entry([
+                {
+                    "name": loaded.plugin.name,
+                    "display_name": loaded.plugin.display_name,
+                    "description": loaded.plugin.description
+                }
+                for loaded in self._load_all(generation)
+            ])
+        return generation.plugins_entry
+    
+    def get_templates_document(self) -> CatalogEntry:
+        """Serialized templates of every plugin for ``/dcc/templates``."""
+        generation = self._current()
+        if generation.templates_entry is None:
+            generation.templates_entry = _catalog_entry({
+                loaded.plugin.name: loaded.template_data
+                for loaded in self._load_all(generation)
+            })
+        return generation.templates_entry
+    
+    def get_plugin_document(self, name: str) -> Optional[CatalogEntry]:
+        """Serialized template document of a plugin for ``/dcc/templates/{name}``."""
+        loaded = self._loaded(name)
+        return loaded.document if loaded else None
 
 
 # Global plugin registry
@@ -0,0 +1,146 @@
+"""
+Plugin discovery sources.
+
+Each source yields a ``PluginSpec`` per plugin without importing it:
+
+- the plugins shipped with the application,
+- entry points of installed packages in the ``PLUGIN_ENTRY_POINT_GROUP``
+  group, e.g. in a plugin package's ``pyproject.toml``::
+
+      [project.entry-points."archi.plugins"]
+      nuke = "archi_nuke:NukePlugin"
+
+- modules in ``PLUGINS_DIR``: ``nuke.py`` or a ``nuke/`` package defining
+  one ``DCCPlugin`` subclass (a package may define it in a submodule and
+  import it in ``__init__.py``), or naming it with a ``plugin`` attribute,
+  registers the plugin ``nuke``.
+
+The entry point (or file) name is the plugin name and has to match the
+plugin's ``name``, since it is the category its settings are stored under.
+"""
+
+import importlib
+import importlib.util
+import inspect
+import sys
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .base import DCCPlugin, PluginSpec
+
+BUILTIN_PLUGINS = {
+    "maya": "app.plugins.maya:MayaPlugin",
+    "blender": "app.plugins.blender:BlenderPlugin",
+    "houdini": "app.plugins.houdini:HoudiniPlugin",
+}
+
+# Modules loaded from the plugins directory are imported under this package name
+DIRECTORY_MODULE_PREFIX = "archi_plugins"
+
+
+def instantiate(obj: Any) -> DCCPlugin:
+    """Turn what a plugin reference points at (a class, factory or instance) into an instance."""
+    if isinstance(obj, DCCPlugin):
+        return obj
+    if callable(obj):
+        return obj()
+    raise TypeError(f"{obj!r} is not a DCCPlugin class, factory or instance")
+
+
+def _import_reference(reference: str) -> Any:
+    module_name, _, attribute = reference.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attribute.split(".") if attribute else ():
+        obj = getattr(obj, part)
+    return obj
+
+
+def builtin_plugins() -> Iterator[PluginSpec]:
+    """The plugins shipped with the application."""
+    for name, reference in BUILTIN_PLUGINS.items():
+        yield PluginSpec(
+            name=name,
+            source=reference,
+            load=lambda reference=reference: instantiate(_import_reference(reference)),
+        )
+
+
+def entry_point_plugins(group: str) -> Callable[[], Iterator[PluginSpec]]:
+    """Source of the plugins installed packages declare in an entry point group."""
+    def source() -> Iterator[PluginSpec]:
+        for entry_point in entry_points(group=group):
+            yield PluginSpec(
+                name=entry_point.name,
+                source=f"entry point {entry_point.value}",
+                load=lambda entry_point=entry_point: instantiate(entry_point.load()),
+            )
+    return source
+
+
+def _load_module(name: str, path: Path) -> Any:
+    """Execute a plugin module from a file; called again on reload, so changed code is picked up."""
+    module_name = f"{DIRECTORY_MODULE_PREFIX}.{name}"
+    if path.is_dir():
+        spec = importlib.util.spec_from_file_location(
+            module_name, path / "__init__.py", submodule_search_locations=[str(path)]
+        )
+    else:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so the plugin's own relative imports resolve
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
+
+
+def _plugin_class(module: Any) -> Any:
+    """Return the plugin a directory module provides.
+
+    A module may name it with a ``plugin`` attribute (a class, factory or
+    instance); otherwise it must define exactly one ``DCCPlugin`` subclass,
+    in the module itself or, for a package, in one of its submodules.
+    """
+    explicit = getattr(module, "plugin", None)
+    if explicit is not None:
+        return explicit
+    package = module.__name__ + "."
+    # Keyed by identity: a class re-exported under several names counts once
+    classes = {
+        id(obj): obj for obj in vars(module).values()
+        if inspect.isclass(obj) and issubclass(obj, DCCPlugin) and not inspect.isabstract(obj)
+        and (obj.__module__ == module.__name__ or obj.__module__.startswith(package))
+    }
+    if len(classes) != 1:
+        raise TypeError(
+            f"{module.__file__} must define exactly one DCCPlugin subclass or name it with a "
+            f"'plugin' attribute, found {len(classes)}"
+        )
+    return next(iter(classes.values()))
+
+
+def directory_plugins(directory: str) -> Callable[[], Iterator[PluginSpec]]:
+    """Source of the plugin modules and packages in a directory."""
+    def source() -> Iterator[PluginSpec]:
+        root = Path(directory)
+        if not root.is_dir():
+            return
+        for path in sorted(root.iterdir()):
+            if path.name.startswith(("_", ".")):
+                continue
+            if path.is_dir() and (path / "__init__.py").is_file():
+                name = path.name
+            elif path.is_file() and path.suffix == ".py":
+                name = path.stem
+            else:
+                continue
+            yield PluginSpec(
+                name=name,
+                source=str(path),
+                load=lambda name=name, path=path: instantiate(_plugin_class(_load_module(name, path))),
+            )
+    return source
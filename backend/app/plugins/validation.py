@@ -0,0 +1,127 @@
+"""
+Validation of setting values against plugin templates.
+
+Each plugin's templates are compiled once, at registration, into a
+``SettingValidator``: a table keyed by setting key holding the template type,
+the allowed options and whether a value is required. Writes look their keys
+up in that table, so validating a request builds no models and runs no
+queries, and the plugin's ``validate_setting``/``transform_value`` hooks are
+only called when the plugin overrides them.
+
+A validated value comes back as the columns of a ``UserSetting`` row: the
+(possibly transformed) text in ``value`` plus its typed columns.
+"""
+
+import json
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from .base import DCCPlugin, DCCSettingTemplate, plugin_registry
+from .values import coerce_value, parsed_value_columns, typed_value_columns
+
+
+class SettingValidationError(ValueError):
+    """A setting value rejected by the template or plugin of its key."""
+
+    def __init__(self, category: str, key: str, message: str):
+        super().__init__(f"Invalid value for '{category}.{key}': {message}")
+        self.category = category
+        self.key = key
+        self.message = message
+
+
+class CompiledTemplate(NamedTuple):
+    """The parts of a template needed to check a value."""
+    value_type: str
+    options: Optional[FrozenSet[str]]
+    required: bool
+
+
+TYPE_NAMES = {"number": "a number", "boolean": "a boolean", "json": "valid JSON"}
+
+
+def _overrides(plugin: DCCPlugin, method: str) -> bool:
+    return getattr(type(plugin), method) is not getattr(DCCPlugin, method)
+
+
+class SettingValidator:
+    """Validator table of one plugin, compiled from its templates."""
+
+    def __init__(self, plugin: DCCPlugin, templates: List[DCCSettingTemplate]):
+        self.category = plugin.name
+        self.table: Dict[str, CompiledTemplate] = {
+            template.key: CompiledTemplate(
+                value_type=template.type,
+                options=frozenset(template.options) if template.options else None,
+                required=template.required,
+            )
+            for template in templates
+        }
+        self._validate = plugin.validate_setting if _overrides(plugin, "validate_setting") else None
+        self._transform = plugin.transform_value if _overrides(plugin, "transform_value") else None
+
+    def normalize(self, key: str, raw: Optional[str]) -> Dict[str, Any]:
+        """Check a value and return its row columns, raising SettingValidationError if invalid.
+
+        Empty values are accepted for keys that are not required; keys
+        without a template are only checked by the plugin hooks.
+        """
+        entry = self.table.get(key)
+        value_type = entry.value_type if entry else None
+
+        if raw is None or raw == "":
+            if entry and entry.required:
+                raise SettingValidationError(self.category, key, "a value is required")
+            return {"value": raw, **typed_value_columns(value_type, raw)}
+
+        try:
+            typed = coerce_value(value_type, raw)
+        except ValueError:
+            raise SettingValidationError(self.category, key, f"must be {TYPE_NAMES.get(value_type, value_type)}")
+        if entry and entry.options is not None and raw not in entry.options:
+            raise SettingValidationError(
+                self.category, key, f"must be one of: {', '.join(sorted(entry.options))}"
+            )
+        if self._validate is not None and not self._validate(key, typed):
+            raise SettingValidationError(self.category, key, "rejected by the plugin")
+
+        if self._transform is not None:
+            transformed = self._transform(key, typed)
+            if transformed != typed:
+                typed = transformed
+                raw = transformed if isinstance(transformed, str) else json.dumps(transformed)
+        return {"value": raw, **parsed_value_columns(typed)}
+
+
+def normalize_setting_value(category: str, key: str, raw: Optional[str]) -> Dict[str, Any]:
+    """Validate one value and return its row columns; categories without a plugin are not checked."""
+    validator = plugin_registry.get_validator(category)
+    if validator is None:
+        return {"value": raw, **typed_value_columns(None, raw)}
+    return validator.normalize(key, raw)
+
+
+def normalize_setting_values(
+    items: Iterable[Tuple[str, str, Optional[str]]]
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, SettingValidationError]]]:
+    """Validate a batch of ``(category, key, value)`` items.
+
+    Returns the row columns of every item (``None`` for rejected ones) and
+    the ``(index, error)`` of every rejected item, so a request can report
+    all of its invalid values at once.
+    """
+    validators: Dict[str, Optional[SettingValidator]] = {}
+    columns: List[Optional[Dict[str, Any]]] = []
+    errors: List[Tuple[int, SettingValidationError]] = []
+    for index, (category, key, raw) in enumerate(items):
+        if category not in validators:
+            validators[category] = plugin_registry.get_validator(category)
+        validator = validators[category]
+        try:
+            if validator is None:
+                columns.append({"value": raw, **typed_value_columns(None, raw)})
+            else:
+                columns.append(validator.normalize(key, raw))
+        except SettingValidationError as e:
+            columns.append(None)
+            errors.append((index, e))
+    return columns, errors
@@ -0,0 +1,83 @@
+"""
+Typed representation of stored setting values.
+
+``UserSetting.value`` keeps the text the client sent. Alongside it every row
+stores the value parsed according to the template type of its key
+(``typed_value``) and copies it into one of the typed shadow columns
+``value_number``, ``value_bool`` or ``value_string``, which are indexed so
+the database can filter on setting values.
+"""
+
+import json
+import math
+from typing import Any, Dict, Optional
+
+from .base import plugin_registry
+
+# Longer strings are not copied to value_string: they would bloat the index
+# and can exceed the maximum index entry size
+MAX_INDEXED_STRING_LENGTH = 255
+
+TRUE_STRINGS = frozenset({"true", "1", "yes", "on"})
+FALSE_STRINGS = frozenset({"false", "0", "no", "off"})
+
+TYPED_COLUMNS = ("typed_value", "value_number", "value_bool", "value_string")
+
+
+def coerce_value(value_type: Optional[str], raw: str) -> Any:
+    """Parse the text of a setting value according to its template type.
+
+    Raises ValueError if the text is not a valid value of that type. Keys
+    without a template, and string-like types, keep the text as is.
+    """
+    if value_type == "number":
+        number = float(raw)
+        if not math.isfinite(number):
+            raise ValueError(f"'{raw}' is not a finite number")
+        # Whole numbers are kept exact (e.g. frame counts) within the float-safe range
+        return int(number) if number.is_integer() and abs(number) < 2 ** 53 else number
+    if value_type == "boolean":
+        lowered = raw.strip().lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+        raise ValueError(f"'{raw}' is not a boolean")
+    if value_type == "json":
+        return json.loads(raw)
+    return raw
+
+
+def typed_value_columns(value_type: Optional[str], raw: Optional[str]) -> Dict[str, Any]:
+    """Return the typed columns of a ``UserSetting`` row holding ``raw``.
+
+    Text that does not parse as its template type is stored as a string, so
+    a row can always be written and filtered on.
+    """
+    if raw is None:
+        return dict.fromkeys(TYPED_COLUMNS)
+    try:
+        typed = coerce_value(value_type, raw)
+    except ValueError:
+        typed = raw
+    return parsed_value_columns(typed)
+
+
+def parsed_value_columns(typed: Any) -> Dict[str, Any]:
+    """Return the typed columns of a value that has already been parsed."""
+    columns = dict.fromkeys(TYPED_COLUMNS)
+    if typed is None:
+        return columns
+    columns["typed_value"] = typed
+    if isinstance(typed, bool):
+        columns["value_bool"] = typed
+    elif isinstance(typed, (int, float)):
+        columns["value_number"] = float(typed)
+    elif isinstance(typed, str) and len(typed) <= MAX_INDEXED_STRING_LENGTH:
+        columns["value_string"] = typed
+    return columns
+
+
+def setting_value_columns(category: str, key: str, raw: Optional[str]) -> Dict[str, Any]:
+    """Return the typed columns for a setting, using the type of its plugin template."""
+    return typed_value_columns(plugin_registry.get_value_type(category, key), raw)
@@ -1,7 +1,33 @@
 """Schemas module initialization."""
-from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserLogin, Token, TokenData
-from .setting import UserSettingBase, UserSettingCreate, UserSettingUpdate, UserSettingResponse
-from .project import ProjectBase, ProjectCreate, ProjectUpdate, ProjectResponse, ProjectMemberResponse
+from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserLogin, Token, TokenData, RefreshRequest
+from .setting import (
+    UserSettingBase,
+    UserSettingCreate,
+    UserSettingUpdate,
+    UserSettingResponse,
+    UserSettingBulkItem,
+    UserSettingBulkRequest,
+    UserSettingBulkResult,
+    UserSettingImportRejection,
+    UserSettingImportResult,
+    UserSettingQueryMatch,
+)
+from .setting_default import SettingDefaultBase, SettingDefaultUpsert, SettingDefaultResponse
+from .project import (
+    ProjectBase,
+    ProjectCreate,
+    ProjectUpdate,
+    ProjectResponse,
+    ProjectSummaryResponse,
+    ProjectUserSummary,
+    ProjectDetailResponse,
+    ProjectMemberResponse,
+    ProjectRole,
+    ProjectMemberAdd,
+    ProjectMembersAddRequest,
+    ProjectMembersRemoveRequest,
+    ProjectMembersResult,
+)
 
 __all__ = [
     "UserBase",
@@ -11,13 +37,31 @@ __all__ = [
     "UserLogin",
     "Token",
     "TokenData",
+    "RefreshRequest",
     "UserSettingBase",
     "UserSettingCreate",
     "UserSettingUpdate",
     "UserSettingResponse",
+    "UserSettingBulkItem",
+    "UserSettingBulkRequest",
+    "UserSettingBulkResult",
+    "UserSettingImportRejection",
+    "UserSettingImportResult",
+    "UserSettingQueryMatch",
+    "SettingDefaultBase",
+    "SettingDefaultUpsert",
+    "SettingDefaultResponse",
     "ProjectBase",
     "ProjectCreate",
     "ProjectUpdate",
     "ProjectResponse",
+    "ProjectSummaryResponse",
+    "ProjectUserSummary",
+    "ProjectDetailResponse",
     "ProjectMemberResponse",
+    "ProjectRole",
+    "ProjectMemberAdd",
+    "ProjectMembersAddRequest",
+    "ProjectMembersRemoveRequest",
+    "ProjectMembersResult",
 ]
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 
+ProjectRole = Literal["owner", "admin", "member"]
+
 
 class ProjectBase(BaseModel):
     """Base project schema."""
@@ -33,6 +35,32 @@ class ProjectResponse(ProjectBase):
         from_attributes = True
 
 
+class ProjectSummaryResponse(ProjectResponse):
+    """Schema for a project in the project list."""
+    role: Optional[str] = None  # the current user's role
+    member_count: Optional[int] = None
+    setting_counts: Optional[Dict[str, int]] = None  # the current user's settings per category
+
+
+class ProjectUserSummary(BaseModel):
+    """Schema for a user related to a project."""
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    section: Optional[str] = None
+    unit: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ProjectDetailResponse(ProjectResponse):
+    """Schema for a single project with the relationships requested by ``include``."""
+    role: Optional[str] = None  # the current user's role
+    creator: Optional[ProjectUserSummary] = None
+    members: Optional[List[ProjectUserSummary]] = None
+
+
 class ProjectMemberResponse(BaseModel):
     """Schema for project member info."""
     user_id: int
@@ -41,3 +69,42 @@ class ProjectMemberResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ProjectMemberAdd(BaseModel):
+    """A user to add to a project, by ID or username."""
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    role: ProjectRole = "member"
+    
+    @model_validator(mode="after")
+    def check_user(self):
+        if (self.user_id is None) == (self.username is None):
+            raise ValueError("Specify exactly one of user_id and username")
+        return self
+
+
+class ProjectMembersAddRequest(BaseModel):
+    """Schema for adding many members to a project, or changing their roles."""
+    members: List[ProjectMemberAdd] = Field(..., min_length=1, max_length=1000)
+
+
+class ProjectMembersRemoveRequest(BaseModel):
+    """Schema for removing many members from a project."""
+    user_ids: List[int] = Field(default_factory=list, max_length=1000)
+    usernames: List[str] = Field(default_factory=list, max_length=1000)
+    
+    @model_validator(mode="after")
+    def check_users(self):
+        if not self.user_ids and not self.usernames:
+            raise ValueError("Specify at least one user ID or username")
+        return self
+
+
+class ProjectMembersResult(BaseModel):
+    """Result of adding or removing project members."""
+    added: int = 0
+    updated: int = 0  # existing members whose role changed
+    removed: int = 0
+    unknown_user_ids: List[int] = []  # no such (active) user, or not a member when removing
+    unknown_usernames: List[str] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Optional, List
 from datetime import datetime
 
 
@@ -27,8 +27,58 @@ class UserSettingResponse(UserSettingBase):
     """Schema for user setting response."""
     id: int
     user_id: int
+    typed_value: Optional[Any] = Field(None, description="Value parsed according to the plugin template type")
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+
+class UserSettingBulkItem(BaseModel):
+    """Single item of a bulk settings upsert."""
+    project_id: int = Field(..., description="Project ID this setting belongs to")
+    category: str = Field(..., description="Setting category (e.g., maya, blender, houdini)")
+    key: str = Field(..., description="Setting key")
+    value: Optional[str] = Field(None, description="Setting value (JSON string or plain text)")
+    description: Optional[str] = Field(None, description="Setting description")
+
+
+class UserSettingBulkRequest(BaseModel):
+    """Schema for upserting many user settings in one request."""
+    items: List[UserSettingBulkItem] = Field(..., min_length=1, max_length=1000)
+
+
+class UserSettingBulkResult(BaseModel):
+    """Per-item result of a bulk settings upsert."""
+    id: int
+    project_id: int
+    category: str
+    key: str
+    status: str  # created, updated
+
+
+class UserSettingImportRejection(BaseModel):
+    """A line of a settings import that was not stored."""
+    line: int
+    reason: str
+
+
+class UserSettingImportResult(BaseModel):
+    """Summary of a streamed settings import."""
+    imported: int
+    rejected: int
+    rejections: List[UserSettingImportRejection] = Field(
+        default_factory=list, description="First rejected lines (capped)"
+    )
+    seconds: float
+    rows_per_second: float
+
+
+class UserSettingQueryMatch(BaseModel):
+    """A user whose setting matched a project settings query."""
+    user_id: int
+    username: str
+    full_name: Optional[str] = None
+    value: Optional[str] = None
+    typed_value: Optional[Any] = None
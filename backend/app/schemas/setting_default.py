@@ -0,0 +1,40 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
+from datetime import datetime
+
+
+class SettingDefaultBase(BaseModel):
+    """Base setting default schema."""
+    scope: Literal["studio", "project", "section", "unit"] = Field(..., description="Scope the default applies to")
+    target: str = Field("", description="Project ID, section or unit name; empty for studio")
+    category: str = Field(..., description="Setting category (e.g., maya, blender, houdini)")
+    key: str = Field(..., description="Setting key")
+    value: Optional[str] = Field(None, description="Default value (JSON string or plain text)")
+    description: Optional[str] = Field(None, description="Setting description")
+
+
+class SettingDefaultUpsert(SettingDefaultBase):
+    """Schema for creating or replacing a setting default."""
+    
+    @model_validator(mode="after")
+    def check_target(self):
+        if self.scope == "studio" and self.target:
+            raise ValueError("Studio defaults must not have a target")
+        if self.scope == "project":
+            if not (self.target.isascii() and self.target.isdigit()):
+                raise ValueError("Project defaults must target a project ID")
+            # Project defaults are looked up by str(project_id), e.g. "5" rather than "05"
+            self.target = str(int(self.target))
+        if self.scope in ("section", "unit") and not self.target:
+            raise ValueError(f"{self.scope.capitalize()} defaults must target a {self.scope} name")
+        return self
+
+
+class SettingDefaultResponse(SettingDefaultBase):
+    """Schema for setting default response."""
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -45,9 +45,16 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     """Schema for authentication token."""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    """Schema for exchanging or revoking a refresh token."""
+    refresh_token: str = Field(..., min_length=1)
+
+
 class TokenData(BaseModel):
     """Schema for token payload data."""
     username: Optional[str] = None
+    user_id: Optional[int] = None
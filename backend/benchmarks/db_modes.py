@@ -0,0 +1,121 @@
+"""
+Compare API throughput of the sync (threadpool) and async database modes.
+
+Each mode runs in its own process because the database mode is chosen from
+DATABASE_URL at import time. The app is served in-process through httpx's
+ASGI transport against a freshly seeded SQLite database.
+
+Usage (from the backend directory):
+    python -m benchmarks.db_modes --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    "sync": "sqlite:///{path}",
+    "async": "sqlite+aiosqlite:///{path}",
+}
+
+
+def seed(users: int, settings_per_user: int):
+    """Create users, one shared project and settings rows; return bearer tokens."""
+    from sqlalchemy import insert
+
+    from app.core import Base, engine, create_access_token, get_password_hash
+    from app.models import User, Project, UserSetting, user_projects
+
+    Base.metadata.create_all(bind=engine)
+    hashed_password = get_password_hash("benchmark-password")
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"artist{i}", "email": f"artist{i}@example.com", "hashed_password": hashed_password}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Project), [{"name": "Benchmark", "created_by": 1}])
+        conn.execute(insert(user_projects), [
+            {"user_id": i, "project_id": 1, "role": "owner" if i == 1 else "member"}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(UserSetting), [
+            {"user_id": i, "project_id": 1, "category": "maya", "key": f"key_{k}", "value": str(k)}
+            for i in range(1, users + 1)
+            for k in range(settings_per_user)
+        ])
+    return [
+        create_access_token({"sub": f"artist{i}", "uid": i})
+        for i in range(1, users + 1)
+    ]
+
+
+async def run_load(app, tokens, total: int, concurrency: int):
+    """Issue ``total`` mixed GET requests with ``concurrency`` in flight."""
+    import httpx
+
+    paths = ["/api/settings/?project_id=1&category=maya", "/api/projects/", "/api/auth/me"]
+    counter = iter(range(total))
+    failures = 0
+
+    async def worker(client):
+        nonlocal failures
+        for i in counter:
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            if response.status_code != 200:
+                failures += 1
+
+    from app.core import dispose_engines
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    await dispose_engines()
+    return {"requests": total, "failures": failures, "seconds": elapsed, "rps": total / elapsed}
+
+
+def run_child(args):
+    tokens = seed(args.users, args.settings)
+    from main import app
+    result = run_load(app, tokens, args.requests, args.concurrency)
+    print(json.dumps(asyncio.run(result)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--settings", type=int, default=50, help="settings rows per user")
+    parser.add_argument("--mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_child(args)
+        return
+
+    results = {}
+    for mode, url in MODES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=url.format(path=os.path.join(tmp, "bench.db")))
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.db_modes", "--mode", mode] + sys.argv[1:],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    for mode, result in results.items():
+        print(f"{mode:>5}: {result['rps']:8.1f} req/s  ({result['requests']} requests, "
+              f"{result['failures']} failures, {result['seconds']:.2f}s)")
+    print(f"async/sync throughput ratio: {results['async']['rps'] / results['sync']['rps']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Replay realistic API scenarios and report latency percentiles and throughput.
+
+The app runs in-process (through httpx's ASGI transport, with its lifespan)
+against a freshly seeded SQLite database of ``--users`` users, each a member
+of ``--projects`` projects with ``--settings`` settings per project. The
+scenarios are:
+
+- login_storm:       many artists logging in at once (password hashing bound)
+- dcc_startup:       DCC tools fetching their launch snapshot
+- bulk_settings_save: saving a plugin's whole settings form in one request
+- template_browsing: browsing plugins, templates and stored settings
+
+Each scenario is run ``--runs`` times and reports the median p50/p95/p99
+latency and requests per second. With ``--baseline`` the results are
+compared to a stored run (made with the same options on the same machine),
+and the command exits with status 1 if any scenario got slower than the
+tolerance allows. Any failed request (status 400 or above) also exits with
+status 1, with or without a baseline, as the timings are then meaningless.
+
+Usage (from the backend directory):
+    python -m benchmarks.load --save baseline.json
+    python -m benchmarks.load --baseline baseline.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+PASSWORD = "benchmark-password"
+PLUGINS = ("maya", "blender", "houdini")
+
+# Request factory: (client, rng) -> awaitable response
+Request = Callable[[Any, random.Random], Any]
+
+
+def as_text(value: Any) -> str:
+    """Render a template default the way the settings form submits it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def form_value(template) -> str:
+    """A valid value for a template, as an artist would save it."""
+    if template.options:
+        return template.options[-1]
+    return {"boolean": "true", "number": "2"}.get(template.type, "/mnt/work")
+
+
+def seed(users: int, projects: int, settings_per_project: int):
+    """Create the schema and seed users, projects, memberships and settings."""
+    from sqlalchemy import insert
+
+    from app.core import Base, engine, get_password_hash
+    from app.models import User, Project, UserSetting, user_projects
+    from app.plugins import plugin_registry, setting_value_columns
+
+    # Template keys with their default values, then custom keys, spread over the plugins
+    template_keys = [
+        (name, template.key, as_text(template.default_value))
+        for name in PLUGINS
+        for template in plugin_registry.get_templates(name)
+    ]
+    keys = template_keys[:settings_per_project] + [
+        (PLUGINS[k % len(PLUGINS)], f"custom_{k}", f"/mnt/projects/shared/{k}")
+        for k in range(max(0, settings_per_project - len(template_keys)))
+    ]
+
+    Base.metadata.create_all(bind=engine)
+    # One hash shared by every user: seeding should not take minutes of Argon2
+    hashed_password = get_password_hash(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"artist{i}", "email": f"artist{i}@example.com", "hashed_password": hashed_password,
+             "section": f"Section {i % 4}", "unit": f"Unit {i % 8}"}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Project), [
+            {"name": f"Project {p}", "description": "Benchmark project", "created_by": 1}
+            for p in range(1, projects + 1)
+        ])
+        conn.execute(insert(user_projects), [
+            {"user_id": i, "project_id": p, "role": "owner" if i == 1 else "member"}
+            for i in range(1, users + 1)
+            for p in range(1, projects + 1)
+        ])
+        for p in range(1, projects + 1):
+            conn.execute(insert(UserSetting), [
+                {"user_id": i, "project_id": p, "category": category, "key": key, "value": value,
+                 **setting_value_columns(category, key, value)}
+                for i in range(1, users + 1)
+                for category, key, value in keys
+            ])
+
+
+def build_scenarios(users: int, projects: int) -> Dict[str, Request]:
+    """Return a request factory per scenario."""
+    from app.core import create_access_token
+    from app.plugins import plugin_registry
+
+    headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': f'artist{i}', 'uid': i})}"}
+        for i in range(1, users + 1)
+    ]
+    forms = {
+        name: [(template.key, form_value(template)) for template in plugin_registry.get_templates(name)]
+        for name in PLUGINS
+    }
+
+    def user(rng):
+        index = rng.randrange(users)
+        return index, headers[index]
+
+    def login_storm(client, rng):
+        index, _ = user(rng)
+        return client.post("/api/auth/login", data={"username": f"artist{index + 1}", "password": PASSWORD})
+
+    def dcc_startup(client, rng):
+        _, auth = user(rng)
+        plugin = rng.choice(PLUGINS)
+        return client.get(f"/api/dcc/snapshot/{plugin}?project_id={rng.randint(1, projects)}", headers=auth)
+
+    def bulk_settings_save(client, rng):
+        _, auth = user(rng)
+        plugin = rng.choice(PLUGINS)
+        project_id = rng.randint(1, projects)
+        return client.post("/api/settings/bulk", headers=auth, json={"items": [
+            {"project_id": project_id, "category": plugin, "key": key, "value": value}
+            for key, value in forms[plugin]
+        ]})
+
+    browse_paths = (
+        lambda rng: "/api/dcc/plugins",
+        lambda rng: "/api/dcc/templates",
+        lambda rng: f"/api/dcc/templates/{rng.choice(PLUGINS)}",
+        lambda rng: f"/api/settings/?project_id={rng.randint(1, projects)}&category={rng.choice(PLUGINS)}",
+    )
+
+    def template_browsing(client, rng):
+        _, auth = user(rng)
+        return client.get(rng.choice(browse_paths)(rng), headers=auth)
+
+    return {
+        "login_storm": login_storm,
+        "dcc_startup": dcc_startup,
+        "bulk_settings_save": bulk_settings_save,
+        "template_browsing": template_browsing,
+    }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+
+async def run_scenario(client, request: Request, total: int, concurrency: int, seed_value: int) -> Dict[str, Any]:
+    """Issue ``total`` requests with ``concurrency`` in flight and summarize their latency."""
+    rng = random.Random(seed_value)
+    remaining = iter(range(total))
+    latencies: List[float] = []
+    failures = 0
+
+    async def worker():
+        nonlocal failures
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await request(client, rng)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "failures": failures,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "rps": round(total / elapsed, 1),
+    }
+
+
+async def run_all(args) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    from main import app
+
+    scenarios = build_scenarios(args.users, args.projects)
+    selected = args.scenarios or list(scenarios)
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for number, name in enumerate(selected):
+                total = args.login_requests if name == "login_storm" else args.requests
+                concurrency = min(args.concurrency, total)
+                # Warm caches and connections; warm-up requests are not measured
+                await run_scenario(client, scenarios[name], min(args.warmup, total), concurrency, seed_value=-1 - number)
+                runs = [
+                    await run_scenario(client, scenarios[name], total, concurrency, seed_value=number)
+                    for _ in range(args.runs)
+                ]
+                # The median of each metric over the runs damps one-off stalls
+                results[name] = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+    return results
+
+
+# Metrics compared against the baseline and whether higher values are better
+COMPARED = (("p50_ms", False), ("p95_ms", False), ("p99_ms", False), ("rps", True))
+
+
+def failed_scenarios(results: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Return a description of every scenario with failed requests.
+
+    Failing requests are usually fast (a 401 or 500 does little work), so
+    their latencies would otherwise pass for a speed-up.
+    """
+    return [
+        f"{name}: {result['failures']} of {result['requests']} requests failed"
+        for name, result in results.items() if result["failures"]
+    ]
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed beyond ``tolerance``."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in COMPARED:
+            before, after = reference[metric], result[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name} {metric}: {before} -> {after} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=5)
+    parser.add_argument("--settings", type=int, default=20, help="settings per user and project")
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=100, help="measured requests of login_storm")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="measured runs per scenario (median reported)")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests before each scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=["login_storm", "dcc_startup", "bulk_settings_save",
+                                                           "template_browsing"])
+    parser.add_argument("--database-url", help="SQLite URL to seed (default: temporary file, sync driver)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The database is chosen from DATABASE_URL when the app is imported
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        seed(args.users, args.projects, args.settings)
+        results = asyncio.run(run_all(args))
+
+        from app.core import engine
+        engine.dispose()
+
+    print(f"{'scenario':<20}{'requests':>9}{'failed':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['requests']:>9}{result['failures']:>8}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['rps']:>10.1f}")
+
+    failures = failed_scenarios(results)
+    if failures:
+        # Latencies of failing requests say nothing about performance; such a run is not saved either
+        print("failed requests:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+    config = {key: getattr(args, key) for key in ("users", "projects", "settings", "requests",
+                                                  "login_requests", "concurrency", "runs")}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"config": config, "scenarios": results}, f, indent=2)
+        print(f"results written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"warning: baseline was recorded with {baseline.get('config')}, this run used {config}")
+        regressions = compare(results, baseline["scenarios"], args.tolerance)
+        if regressions:
+            print(f"regressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
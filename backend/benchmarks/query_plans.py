@@ -0,0 +1,205 @@
+"""
+Check the query plans of the router queries for full table scans.
+
+Runs EXPLAIN for the query shapes used by app/api against a database
+migrated to head and exits non-zero if any of them scans a whole table.
+On PostgreSQL sequential scans are disabled for the check, so a plan only
+passes if an index path exists (small tables would otherwise always be
+scanned). tests/test_query_plans.py runs the same check on SQLite
+under pytest.
+
+Usage (from the backend directory):
+    python -m benchmarks.query_plans                       # temporary SQLite database
+    python -m benchmarks.query_plans --database-url postgresql://...
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+
+def router_queries():
+    """Return (name, statement) pairs mirroring the queries issued by the routers."""
+    from sqlalchemy import and_, literal, or_, select, tuple_, union_all
+
+    from app.models import User, Project, UserSetting, SettingDefault, user_projects
+
+    user_id, project_id = 1, 1
+    project_join = select(Project).join(user_projects, Project.id == user_projects.c.project_id)
+    user_settings = select(UserSetting).filter(
+        UserSetting.user_id == user_id,
+        UserSetting.project_id == project_id
+    )
+    return [
+        ("auth.get_current_user", select(User).filter(User.id == user_id)),
+        ("auth.login", select(User).filter(User.username == "artist")),
+        ("users.list_users", select(User).filter(User.id > 0).order_by(User.id).limit(100)),
+        ("projects.list_projects", project_join.filter(
+            user_projects.c.user_id == user_id,
+            Project.is_active == True
+        )),
+        ("projects.get_project", project_join.filter(
+            Project.id == project_id,
+            user_projects.c.user_id == user_id
+        )),
+        ("projects.members_by_project", select(user_projects).filter(
+            user_projects.c.project_id == project_id
+        )),
+        ("settings.list_user_settings", user_settings.filter(
+            UserSetting.category == "maya"
+        ).order_by(UserSetting.category, UserSetting.key, UserSetting.id)),
+        ("settings.list_user_settings[cursor]", user_settings.filter(
+            tuple_(UserSetting.category, UserSetting.key, UserSetting.id) > tuple_("maya", "a", 0)
+        ).order_by(UserSetting.category, UserSetting.key, UserSetting.id).limit(100)),
+        ("settings.create_user_setting[duplicate]", select(UserSetting.id).filter(
+            UserSetting.user_id == user_id,
+            UserSetting.project_id == project_id,
+            UserSetting.category == "maya",
+            UserSetting.key == "render_engine"
+        )),
+        ("settings.get_user_setting", select(UserSetting).filter(
+            UserSetting.id == 1,
+            UserSetting.user_id == user_id
+        )),
+        ("settings.project_wide_key", select(UserSetting).filter(
+            UserSetting.project_id == project_id,
+            UserSetting.category == "maya",
+            UserSetting.key == "render_engine"
+        )),
+        ("dcc.get_launch_snapshot", select(Project.name).join(
+            user_projects,
+            and_(user_projects.c.project_id == Project.id, user_projects.c.user_id == user_id)
+        ).filter(Project.id == project_id)),
+        ("defaults.resolve_effective_settings", union_all(
+            select(SettingDefault.scope, SettingDefault.key, SettingDefault.value).filter(
+                SettingDefault.category == "maya",
+                or_(
+                    and_(SettingDefault.scope == "studio", SettingDefault.target == ""),
+                    and_(SettingDefault.scope == "project", SettingDefault.target == "1"),
+                    and_(SettingDefault.scope == "section", SettingDefault.target == "Animation"),
+                    and_(SettingDefault.scope == "unit", SettingDefault.target == "Unit A"),
+                )
+            ),
+            select(literal("user"), UserSetting.key, UserSetting.value).filter(
+                UserSetting.user_id == user_id,
+                UserSetting.project_id == project_id,
+                UserSetting.category == "maya"
+            )
+        )),
+        ("defaults.resolve_all_effective_settings", union_all(
+            select(SettingDefault.scope, SettingDefault.category, SettingDefault.key, SettingDefault.value).filter(
+                or_(
+                    and_(SettingDefault.scope == "studio", SettingDefault.target == ""),
+                    and_(SettingDefault.scope == "project", SettingDefault.target == "1"),
+                    and_(SettingDefault.scope == "section", SettingDefault.target == "Animation"),
+                    and_(SettingDefault.scope == "unit", SettingDefault.target == "Unit A"),
+                )
+            ),
+            select(literal("user"), UserSetting.category, UserSetting.key, UserSetting.value).filter(
+                UserSetting.user_id == user_id,
+                UserSetting.project_id == project_id
+            )
+        )),
+        ("project_settings.query[string]", select(UserSetting.user_id, User.username).join(
+            User, User.id == UserSetting.user_id
+        ).filter(
+            UserSetting.project_id == project_id,
+            UserSetting.category == "maya",
+            UserSetting.key == "render_engine",
+            UserSetting.value_string == "arnold",
+            UserSetting.user_id > 0
+        ).order_by(UserSetting.user_id).limit(100)),
+        ("project_settings.query[number]", select(UserSetting.user_id, User.username).join(
+            User, User.id == UserSetting.user_id
+        ).filter(
+            UserSetting.project_id == project_id,
+            UserSetting.category == "maya",
+            UserSetting.key == "ui_scale",
+            UserSetting.value_number == 1.0
+        ).order_by(UserSetting.user_id).limit(100)),
+        ("project_settings.export", select(
+            User.username, UserSetting.category, UserSetting.key
+        ).join(User, User.id == UserSetting.user_id).filter(
+            UserSetting.project_id == project_id
+        ).order_by(UserSetting.category, UserSetting.key, UserSetting.user_id)),
+        ("project_settings.matrix[keys]", select(UserSetting.key).distinct().join(
+            user_projects,
+            and_(
+                user_projects.c.user_id == UserSetting.user_id,
+                user_projects.c.project_id == UserSetting.project_id
+            )
+        ).filter(
+            UserSetting.project_id == project_id,
+            UserSetting.category == "maya"
+        ).order_by(UserSetting.key)),
+        ("project_settings.import[members]", select(User.username, User.id).join(
+            user_projects, User.id == user_projects.c.user_id
+        ).filter(
+            user_projects.c.project_id == project_id,
+            User.username.in_(["artist", "lead"])
+        )),
+    ]
+
+
+def explain(connection, statement):
+    """Return the plan lines and whether they contain a full table scan."""
+    from sqlalchemy import text
+
+    compiled = statement.compile(connection, compile_kwargs={"literal_binds": True})
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+        lines = [row[-1] for row in rows]
+        # "SCAN t USING [COVERING] INDEX" still walks the whole index
+        full_scan = any(line.startswith("SCAN ") for line in lines)
+    else:
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        lines = [row[0] for row in connection.execute(text(f"EXPLAIN {compiled}"))]
+        full_scan = any("Seq Scan" in line for line in lines)
+    return lines, full_scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="database to check (default: temporary SQLite)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'plans.db')}"
+
+    from alembic import command
+    from alembic.config import Config
+
+    from app.core.database import engine
+
+    command.upgrade(Config("alembic.ini"), "head")
+
+    failures = []
+    with engine.connect() as connection:
+        for name, statement in router_queries():
+            with connection.begin():
+                lines, full_scan = explain(connection, statement)
+            if full_scan:
+                failures.append(name)
+            if full_scan or args.verbose:
+                print(f"{'FULL SCAN' if full_scan else 'ok':>9}  {name}")
+                for line in lines:
+                    print(f"           {line}")
+            else:
+                print(f"{'ok':>9}  {name}")
+
+    engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+    if failures:
+        print(f"{len(failures)} queries scan a full table: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
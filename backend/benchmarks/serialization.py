@@ -0,0 +1,105 @@
+"""
+Compare the default and fast response serialization of the list endpoints.
+
+For each router's list endpoint, builds ``--rows`` ORM objects and times
+turning them into a response body three ways:
+
+- default: FastAPI's response_model validation + stdlib json (JSONResponse)
+- orjson:  the same validation, encoded by ORJSONResponse
+- fast:    the precompiled TypeAdapter used when FAST_RESPONSES is enabled
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization --rows 5000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+
+
+def build_rows(count: int):
+    """Return transient ORM rows for each list endpoint, keyed by route path."""
+    from app.models import User, Project, UserSetting
+
+    now = datetime.now(timezone.utc)
+    return {
+        "/api/users/": [
+            User(id=i, username=f"artist{i}", email=f"artist{i}@example.com", full_name=f"Artist {i}",
+                 section="Animation", unit="Unit A", is_active=True, created_at=now, updated_at=now)
+            for i in range(1, count + 1)
+        ],
+        "/api/projects/": [
+            Project(id=i, name=f"Project {i}", description="Benchmark project", created_by=1,
+                    is_active=True, created_at=now, updated_at=None)
+            for i in range(1, count + 1)
+        ],
+        "/api/settings/": [
+            UserSetting(id=i, user_id=1, project_id=1, category="maya", key=f"key_{i}",
+                        value='{"path": "/mnt/projects/shared"}', description=None,
+                        created_at=now, updated_at=now)
+            for i in range(1, count + 1)
+        ],
+    }
+
+
+def measure(fn, repeat: int) -> float:
+    """Return the median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import APIRoute, serialize_response
+
+    import main as app_main
+    from app.api.projects import project_list_serializer
+    from app.api.settings import setting_list_serializer
+    from app.api.users import user_list_serializer
+
+    serializers = {
+        "/api/users/": user_list_serializer,
+        "/api/projects/": project_list_serializer,
+        "/api/settings/": setting_list_serializer,
+    }
+    routes = {
+        route.path: route for route in app_main.app.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods and route.path in serializers
+    }
+    loop = asyncio.new_event_loop()
+
+    def validated(route, rows):
+        return loop.run_until_complete(
+            serialize_response(field=route.response_field, response_content=rows, is_coroutine=True)
+        )
+
+    print(f"{'route':<16}{'default ms':>12}{'orjson ms':>12}{'fast ms':>10}{'speedup':>9}")
+    for path, rows in build_rows(args.rows).items():
+        route, serializer = routes[path], serializers[path]
+        # Both paths must produce the same document
+        assert json.loads(JSONResponse(validated(route, rows)).body) == json.loads(serializer.render(rows)), path
+
+        default = measure(lambda: JSONResponse(validated(route, rows)).body, args.repeat)
+        orjson_only = measure(lambda: ORJSONResponse(validated(route, rows)).body, args.repeat)
+        fast = measure(lambda: serializer.render(rows), args.repeat)
+        print(f"{path:<16}{default:>12.2f}{orjson_only:>12.2f}{fast:>10.2f}{default / fast:>8.1f}x")
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measure access token verification cost per request with and without the token cache.
+
+Simulates ``--clients`` DCC clients that each send their own token on every
+request, and times ``decode_access_token`` (cached) against
+``verify_access_token`` (full signature and claim verification) over
+``--requests`` requests.
+
+Usage (from the backend directory):
+    python -m benchmarks.token_cache --requests 50000 --clients 200
+"""
+
+import argparse
+import os
+import time
+
+
+def per_request_us(decode, tokens, requests: int) -> float:
+    """Return the mean microseconds per call of ``decode`` over ``requests`` calls."""
+    count = len(tokens)
+    start = time.perf_counter()
+    for i in range(requests):
+        if decode(tokens[i % count]) is None:
+            raise RuntimeError("token failed to verify")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--clients", type=int, default=200, help="distinct tokens in use")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    from app.core.security import create_access_token, decode_access_token, verify_access_token, token_cache
+
+    tokens = [create_access_token({"sub": f"artist{i}", "uid": i}) for i in range(1, args.clients + 1)]
+    # Import python-jose and warm both paths before timing
+    per_request_us(verify_access_token, tokens, args.clients)
+    token_cache.clear()
+
+    uncached = per_request_us(verify_access_token, tokens, args.requests)
+    cached = per_request_us(decode_access_token, tokens, args.requests)
+    stats = token_cache.stats()
+
+    print(f"without cache: {uncached:8.2f} us/request")
+    print(f"with cache:    {cached:8.2f} us/request  "
+          f"({stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries)")
+    print(f"speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,67 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core import (
+    settings,
+    dispose_engines,
+    get_pool_status,
+    hash_stats,
+    start_hash_pool,
+    shutdown_hash_pool,
+    settings_events,
+    StreamingAwareGZipMiddleware,
+    MetricsMiddleware,
+    PROMETHEUS_CONTENT_TYPE,
+    http_metrics,
+    render_pool_metrics,
+    render_threadpool_metrics,
+    revoked_tokens,
+)
+from app.api import (
+    auth_router,
+    users_router,
+    settings_router,
+    dcc_router,
+    projects_router,
+    project_settings_router,
+    defaults_router,
+)
+from app.api.auth import run_revocation_sync
+from app.api.dcc import PLUGINS_CHANNEL, on_plugins_event
+from app.plugins import plugin_registry
+
+logger = logging.getLogger(__name__)
 
-from app.core import settings, Base, engine
-from app.api import auth_router, users_router, settings_router, dcc_router, projects_router
+# The schema is managed by migrations (`alembic upgrade head`), not at import
+# time: every worker would otherwise connect and race on DDL before serving.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    plugin_registry.ensure_loaded()
+    # Spawn hashing workers once the server is up instead of delaying readiness
+    asyncio.get_running_loop().call_soon(start_hash_pool)
+    settings_events.add_listener(PLUGINS_CHANNEL, on_plugins_event)
+    await settings_events.start()
+    revocation_sync = asyncio.create_task(run_revocation_sync())
+    yield
+    revocation_sync.cancel()
+    with suppress(asyncio.CancelledError):
+        await revocation_sync
+    await settings_events.stop()
+    settings_events.remove_listener(PLUGINS_CHANNEL, on_plugins_event)
+    # Waits for the hashing workers to exit; kept off the event loop
+    await run_in_threadpool(shutdown_hash_pool)
+    # Async drivers keep worker threads/connections alive until disposed
+    await dispose_engines()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -14,12 +70,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse if settings.FAST_RESPONSES else JSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
 origins = settings.get_allowed_origins() if hasattr(settings, 'get_allowed_origins') else settings.ALLOWED_ORIGINS
-print(f"Allowed CORS origins: {origins}")  # デバッグ用
+logger.info("Allowed CORS origins: %s", origins)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,13 +85,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+if settings.GZIP_MINIMUM_SIZE > 0:
+    app.add_middleware(
+        StreamingAwareGZipMiddleware,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        compresslevel=settings.GZIP_COMPRESSLEVEL,
+    )
+
+# Added last so it wraps every other middleware and times the full response
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=http_metrics)
+
 # Include routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
 app.include_router(projects_router, prefix="/api")
+app.include_router(project_settings_router, prefix="/api")
 app.include_router(settings_router, prefix="/api")
+app.include_router(defaults_router, prefix="/api")
 app.include_router(dcc_router, prefix="/api")
 
 
@@ -53,6 +125,39 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/pool")
+def pool_status():
+    """Database connection pool gauges and checkout statistics."""
+    return get_pool_status()
+
+
+@app.get("/health/hashing")
+def hashing_status():
+    """Password hashing queue wait and hash time statistics."""
+    return hash_stats.snapshot()
+
+
+@app.get("/health/events")
+def events_status():
+    """Settings change feed subscribers and delivery statistics."""
+    return settings_events.stats()
+
+
+@app.get("/health/revocations")
+def revocations_status():
+    """Revoked access tokens held in memory and their sync state."""
+    return revoked_tokens.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, database pool and threadpool metrics in Prometheus text format."""
+    lines = http_metrics.render() if settings.METRICS_ENABLED else []
+    lines += render_pool_metrics(get_pool_status())
+    lines += render_threadpool_metrics()
+    return Response("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=settings.DEBUG)
@@ -0,0 +1,46 @@
+"""query shape indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 03:19:13.275235
+
+Per-user settings lookups filter on (user_id, project_id[, category]) and are
+served by the uq_user_project_category_key index, so the single-column
+category/key indexes only cost writes. Adds the project-side indexes and
+partial indexes on active rows (PostgreSQL and SQLite).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_user_settings_category', table_name='user_settings')
+    op.drop_index('ix_user_settings_key', table_name='user_settings')
+    op.create_index('ix_user_settings_project_category_key', 'user_settings', ['project_id', 'category', 'key'], unique=False)
+    op.create_index('ix_user_projects_project_id_user_id', 'user_projects', ['project_id', 'user_id'], unique=False)
+    op.create_index(
+        'ix_projects_created_by_active', 'projects', ['created_by'], unique=False,
+        postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active = 1'),
+    )
+    op.create_index(
+        'ix_users_section_unit_active', 'users', ['section', 'unit'], unique=False,
+        postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active = 1'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_section_unit_active', table_name='users')
+    op.drop_index('ix_projects_created_by_active', table_name='projects')
+    op.drop_index('ix_user_projects_project_id_user_id', table_name='user_projects')
+    op.drop_index('ix_user_settings_project_category_key', table_name='user_settings')
+    op.create_index('ix_user_settings_key', 'user_settings', ['key'], unique=False)
+    op.create_index('ix_user_settings_category', 'user_settings', ['category'], unique=False)
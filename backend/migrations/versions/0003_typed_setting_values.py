@@ -0,0 +1,145 @@
+"""typed setting values
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:12:40.518302
+
+Adds the typed representation of user_settings.value (a JSON column plus
+number/boolean/string shadow columns), backfills it from the plugin
+template types, and replaces the (project_id, category, key) index with
+indexes that also cover the shadow columns.
+"""
+import json
+import math
+from typing import Any, Dict, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copy of the parsing rules and template types of this revision, so
+# replaying the migration backfills the same data whatever plugins and
+# parsing code the application has by then.
+# Template types of the built-in plugins' keys that are not stored as text
+TEMPLATE_TYPES = {
+    ('maya', 'ui_scale'): 'number',
+    ('maya', 'auto_save_enabled'): 'boolean',
+    ('maya', 'auto_save_interval'): 'number',
+    ('blender', 'samples'): 'number',
+    ('blender', 'auto_save_enabled'): 'boolean',
+    ('blender', 'save_versions'): 'number',
+    ('houdini', 'thread_count'): 'number',
+}
+MAX_INDEXED_STRING_LENGTH = 255
+TRUE_STRINGS = frozenset({'true', '1', 'yes', 'on'})
+FALSE_STRINGS = frozenset({'false', '0', 'no', 'off'})
+
+
+def coerce_value(value_type: Optional[str], raw: str) -> Any:
+    if value_type == 'number':
+        number = float(raw)
+        if not math.isfinite(number):
+            raise ValueError(raw)
+        return int(number) if number.is_integer() and abs(number) < 2 ** 53 else number
+    if value_type == 'boolean':
+        lowered = raw.strip().lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+        raise ValueError(raw)
+    if value_type == 'json':
+        return json.loads(raw)
+    return raw
+
+
+def setting_value_columns(category: str, key: str, raw: str) -> Dict[str, Any]:
+    """Typed columns of a stored value; text that does not parse as its type is kept as a string."""
+    try:
+        typed = coerce_value(TEMPLATE_TYPES.get((category, key)), raw)
+    except ValueError:
+        typed = raw
+    columns = dict.fromkeys(('typed_value', 'value_number', 'value_bool', 'value_string'))
+    if typed is None:
+        return columns
+    columns['typed_value'] = typed
+    if isinstance(typed, bool):
+        columns['value_bool'] = typed
+    elif isinstance(typed, (int, float)):
+        columns['value_number'] = float(typed)
+    elif isinstance(typed, str) and len(typed) <= MAX_INDEXED_STRING_LENGTH:
+        columns['value_string'] = typed
+    return columns
+
+
+def backfill_typed_values() -> None:
+    user_settings = sa.table(
+        'user_settings',
+        sa.column('id', sa.Integer),
+        sa.column('category', sa.String),
+        sa.column('key', sa.String),
+        sa.column('value', sa.Text),
+        sa.column('typed_value', sa.JSON),
+        sa.column('value_number', sa.Float),
+        sa.column('value_bool', sa.Boolean),
+        sa.column('value_string', sa.String),
+    )
+    update = user_settings.update().where(user_settings.c.id == sa.bindparam('row_id')).values(
+        typed_value=sa.bindparam('typed_value'),
+        value_number=sa.bindparam('value_number'),
+        value_bool=sa.bindparam('value_bool'),
+        value_string=sa.bindparam('value_string'),
+    )
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(user_settings.c.id, user_settings.c.category, user_settings.c.key, user_settings.c.value)
+            .where(user_settings.c.id > last_id, user_settings.c.value.is_not(None))
+            .order_by(user_settings.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {"row_id": row.id, **setting_value_columns(row.category, row.key, row.value)}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('user_settings', sa.Column('typed_value', sa.JSON(), nullable=True))
+    op.add_column('user_settings', sa.Column('value_number', sa.Float(), nullable=True))
+    op.add_column('user_settings', sa.Column('value_bool', sa.Boolean(), nullable=True))
+    op.add_column('user_settings', sa.Column('value_string', sa.String(), nullable=True))
+    backfill_typed_values()
+    op.drop_index('ix_user_settings_project_category_key', table_name='user_settings')
+    op.create_index(
+        'ix_user_settings_project_key_string', 'user_settings',
+        ['project_id', 'category', 'key', 'value_string', 'user_id'], unique=False,
+    )
+    op.create_index(
+        'ix_user_settings_project_key_number', 'user_settings',
+        ['project_id', 'category', 'key', 'value_number', 'user_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_settings_project_key_number', table_name='user_settings')
+    op.drop_index('ix_user_settings_project_key_string', table_name='user_settings')
+    op.create_index('ix_user_settings_project_category_key', 'user_settings', ['project_id', 'category', 'key'], unique=False)
+    with op.batch_alter_table('user_settings') as batch_op:
+        batch_op.drop_column('value_string')
+        batch_op.drop_column('value_bool')
+        batch_op.drop_column('value_number')
+        batch_op.drop_column('typed_value')
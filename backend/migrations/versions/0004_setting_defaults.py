@@ -0,0 +1,42 @@
+"""setting defaults
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:41:07.902114
+
+Adds setting_defaults, holding studio, project, section and unit level
+defaults that are layered under the per-user rows of user_settings.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('setting_defaults',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('target', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('value', sa.Text(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'target', 'category', 'key', name='uq_setting_default_scope_key')
+    )
+    op.create_index('ix_setting_defaults_id', 'setting_defaults', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_setting_defaults_id', table_name='setting_defaults')
+    op.drop_table('setting_defaults')
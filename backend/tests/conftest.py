@@ -0,0 +1,28 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# The engine is created from DATABASE_URL when app.core is first imported,
+# so the tests' database has to be chosen before any test module imports it
+_database_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir.name, 'test.db')}"
+
+
+@pytest.fixture(scope="session")
+def migrated_engine():
+    """The application's engine, on a temporary SQLite database migrated to head."""
+    from alembic import command
+    from alembic.config import Config
+
+    from app.core.database import engine
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    command.upgrade(config, "head")
+    yield engine
+    engine.dispose()
+    _database_dir.cleanup()
@@ -0,0 +1,19 @@
+from app.core.cache import TTLCache
+
+
+def test_deadline_heap_stays_bounded_below_maxsize():
+    cache = TTLCache(maxsize=1000, ttl=60)
+    for i in range(200_000):
+        cache.set(i % 300, i)
+    assert len(cache) == 300
+    assert len(cache._deadlines) <= 2 * cache.maxsize + 64
+    assert cache.get(5) == 199_805
+
+
+def test_full_cache_drops_least_recently_used():
+    cache = TTLCache(maxsize=10, ttl=60)
+    for i in range(100):
+        cache.set(i, i)
+    assert len(cache) == 10
+    assert cache.get(89) is None
+    assert cache.get(99) == 99
@@ -0,0 +1,14 @@
+"""The router queries must be answered from indexes, never by scanning a whole table."""
+
+import pytest
+
+from benchmarks.query_plans import explain, router_queries
+
+QUERIES = router_queries()
+
+
+@pytest.mark.parametrize("name,statement", QUERIES, ids=[name for name, _ in QUERIES])
+def test_query_plan_has_no_full_scan(migrated_engine, name, statement):
+    with migrated_engine.connect() as connection:
+        lines, full_scan = explain(connection, statement)
+    assert not full_scan, f"{name} scans a full table:\n" + "\n".join(lines)
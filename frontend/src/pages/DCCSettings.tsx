@@ -3,13 +3,12 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { dccService } from '../services/dcc';
 import { settingsService } from '../services/settings';
 import { projectService } from '../services/projects';
-import { DCCPluginTemplate, DCCSettingTemplate, UserSetting } from '../types';
+import { DCCPluginTemplate, DCCSettingTemplate } from '../types';
 
 const DCCSettings: React.FC = () => {
   const { pluginName } = useParams<{ pluginName: string }>();
   const navigate = useNavigate();
   const [template, setTemplate] = useState<DCCPluginTemplate | null>(null);
-  const [existingSettings, setExistingSettings] = useState<UserSetting[]>([]);
   const [formData, setFormData] = useState<Record<string, string>>({});
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
@@ -35,7 +34,6 @@ const DCCSettings: React.FC = () => {
       ]);
 
       setTemplate(templateData);
-      setExistingSettings(settingsData);
 
       // Initialize form data with existing settings or defaults
       const initialData: Record<string, string> = {};
@@ -72,28 +70,16 @@ const DCCSettings: React.FC = () => {
         return;
       }
 
-      // Save or update each setting
-      for (const [key, value] of Object.entries(formData)) {
-        const existing = existingSettings.find((s) => s.key === key);
-        const settingTemplate = template?.settings.find((s) => s.key === key);
-
-        if (existing) {
-          // Update existing setting
-          await settingsService.updateSetting(existing.id, {
-            value,
-            description: settingTemplate?.description,
-          });
-        } else {
-          // Create new setting
-          await settingsService.createSetting({
-            project_id: projectId,
-            category: pluginName,
-            key,
-            value,
-            description: settingTemplate?.description,
-          });
-        }
-      }
+      // Save all settings in a single request
+      await settingsService.bulkUpsertSettings(
+        Object.entries(formData).map(([key, value]) => ({
+          project_id: projectId,
+          category: pluginName,
+          key,
+          value,
+          description: template?.settings.find((s) => s.key === key)?.description,
+        }))
+      );
 
       setMessage('Settings saved successfully!');
       setTimeout(() => navigate('/dashboard'), 2000);
@@ -1,5 +1,5 @@
 import api from './api';
-import { UserSetting, UserSettingCreate, UserSettingUpdate } from '../types';
+import { UserSetting, UserSettingCreate, UserSettingUpdate, UserSettingBulkResult } from '../types';
 
 export const settingsService = {
   async listSettings(projectId: number, category?: string): Promise<UserSetting[]> {
@@ -12,6 +12,15 @@ export const settingsService = {
     return Array.isArray(response.data) ? response.data : [];
   },
 
+  async getEffectiveSettings(projectId: number, category?: string): Promise<Record<string, Record<string, any>>> {
+    const params: any = { project_id: projectId };
+    if (category) {
+      params.category = category;
+    }
+    const response = await api.get<Record<string, Record<string, any>>>('/settings/effective', { params });
+    return response.data;
+  },
+
   async createSetting(settingData: UserSettingCreate): Promise<UserSetting> {
     const response = await api.post<UserSetting>('/settings/', settingData);
     return response.data;
@@ -22,6 +31,11 @@ export const settingsService = {
     return response.data;
   },
 
+  async bulkUpsertSettings(items: UserSettingCreate[]): Promise<UserSettingBulkResult[]> {
+    const response = await api.post<UserSettingBulkResult[]>('/settings/bulk', { items });
+    return response.data;
+  },
+
   async deleteSetting(settingId: number): Promise<void> {
     await api.delete(`/settings/${settingId}`);
   },
@@ -33,6 +33,7 @@ export interface UserLogin {
 
 export interface Token {
   access_token: string;
+  refresh_token?: string;
   token_type: string;
 }
 
@@ -43,6 +44,7 @@ export interface UserSetting {
   category: string;
   key: string;
   value?: string;
+  typed_value?: unknown;
   description?: string;
   created_at: string;
   updated_at?: string;
@@ -61,6 +63,14 @@ export interface UserSettingUpdate {
   description?: string;
 }
 
+export interface UserSettingBulkResult {
+  id: number;
+  project_id: number;
+  category: string;
+  key: string;
+  status: 'created' | 'updated';
+}
+
 export interface DCCPlugin {
   name: string;
   display_name: string;
@@ -89,6 +99,9 @@ export interface Project {
   is_active: boolean;
   created_at: string;
   updated_at?: string;
+  role?: string;
+  member_count?: number;
+  setting_counts?: Record<string, number>;
 }
 
 export interface ProjectCreate {